@@ -0,0 +1,363 @@
+""" Benchmarks spec generation and serving on synthetic apps
+
+    Times the main stages of building and serving the spec on apps of increasing size and records
+    the peak memory of a complete build. Results are written as JSON and can be compared against
+    the results of a previous run, eg of the release running in production. Benchmarks of
+    features the installed release lacks are skipped
+
+    .. code-block:: bash
+
+        python -m benchmarks.run --output baseline.json
+        pip install -U flaskdoc
+        python -m benchmarks.run --output current.json --baseline baseline.json
+"""
+import contextlib
+import datetime
+import functools
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import click
+
+import flaskdoc
+from benchmarks.synthetic import make_app, make_items
+from flaskdoc import jo, swagger
+from flaskdoc.pallets import plugins
+from flaskdoc.pallets.app import get_api_docs
+
+try:
+    from importlib import metadata
+except ImportError:  # pragma: no cover, python < 3.8
+    metadata = None
+
+ROUTES = (100, 1000, 10000)
+# requests served from the encoded documents are timed in batches
+CACHED_REQUESTS = 100
+
+
+def get_version():
+    """Returns the installed flaskdoc version"""
+
+    if metadata is not None:
+        try:
+            return metadata.version("flaskdoc")
+        except metadata.PackageNotFoundError:
+            pass
+    return flaskdoc.__version__
+
+
+@contextlib.contextmanager
+def isolated_registries():
+    """Restores the process wide spec registries on exit
+
+    Every synthetic app registers new view functions, timings would otherwise depend on the
+    number of apps created by earlier benchmarks and runs.
+    """
+    specs = dict(plugins.API_SPECS)
+    spec_log = getattr(plugins, "SPEC_LOG", None)
+    log_length = len(spec_log) if spec_log is not None else 0
+    try:
+        yield
+    finally:
+        plugins.API_SPECS.clear()
+        plugins.API_SPECS.update(specs)
+        if spec_log is not None:
+            del spec_log[log_length:]
+
+
+def built_app(routes):
+    app = make_app(routes)
+    with app.app_context():
+        get_api_docs(app)
+    return app
+
+
+def bench_parse_flask_rule(routes):
+    rules = [rule.rule for rule in make_app(routes).url_map.iter_rules()]
+
+    def run():
+        # parsed rules are memoized, time the parsing itself
+        parse_rule = getattr(plugins, "_parse_rule", None)
+        getattr(parse_rule, "cache_clear", lambda: None)()
+        for rule in rules:
+            plugins.parse_flask_rule(rule)
+
+    return run, None
+
+
+def bench_get_schema(routes):
+    models = make_app(routes).config["SYNTHETIC_MODELS"]
+
+    def run():
+        factory = swagger.SchemaFactory()
+        for model in models:
+            factory.get_schema(model)
+
+    return run, None
+
+
+def bench_get_api_docs(routes):
+    def run():
+        app = make_app(routes)
+        start = time.perf_counter()
+        with app.app_context():
+            get_api_docs(app)
+        return time.perf_counter() - start
+
+    return run, None
+
+
+def bench_to_dict(routes):
+    api = built_app(routes).openapi
+    return api.to_dict, None
+
+
+def bench_dumps(routes):
+    items = make_items(make_app(routes))
+    return functools.partial(jo.dumps, items), None
+
+
+def bench_load(routes):
+    items = make_items(make_app(routes))
+    data = [(type(item), json.loads(jo.dumps(item))) for item in items]
+
+    def run():
+        for model, item in data:
+            jo.load(model, item)
+
+    return run, None
+
+
+def bench_cold_request(path):
+    def bench(routes):
+        def run():
+            client = make_app(routes).test_client()
+            start = time.perf_counter()
+            client.get(path)
+            return time.perf_counter() - start
+
+        return run, None
+
+    return bench
+
+
+def bench_cached_request(path):
+    def bench(routes):
+        client = built_app(routes).test_client()
+        client.get(path)
+
+        def run():
+            for _ in range(CACHED_REQUESTS):
+                client.get(path, headers={"Accept-Encoding": "identity"})
+
+        return run, CACHED_REQUESTS
+
+    return bench
+
+
+BENCHMARKS = {
+    "parse_flask_rule": bench_parse_flask_rule,
+    "SchemaFactory.get_schema": bench_get_schema,
+    "get_api_docs": bench_get_api_docs,
+    "OpenApi.to_dict": bench_to_dict,
+    "GET openapi.json cold": bench_cold_request("/docs/openapi.json"),
+    "GET openapi.json cached": bench_cached_request("/docs/openapi.json"),
+    "GET openapi.yaml cold": bench_cold_request("/docs/openapi.yaml"),
+    "GET openapi.yaml cached": bench_cached_request("/docs/openapi.yaml"),
+    "GET openapi.json?tag cached": bench_cached_request("/docs/openapi.json?tag=resource0"),
+    "jo.dumps": bench_dumps,
+    "jo.load": bench_load,
+}
+# checks of the features benchmarks need, older releases used as baseline may lack them
+REQUIREMENTS = {
+    "GET openapi.json?tag cached": lambda: importlib.util.find_spec("flaskdoc.pallets.slices"),
+    "jo.dumps": lambda: hasattr(jo, "dumps"),
+    "jo.load": lambda: hasattr(jo, "load"),
+}
+
+
+def is_available(name):
+    """Tells whether the installed flaskdoc release has the features a benchmark needs"""
+
+    requirement = REQUIREMENTS.get(name)
+    return requirement is None or bool(requirement())
+
+
+def time_benchmark(name, routes, repeat):
+    """Runs a benchmark `repeat` times
+
+    Benchmarks return a `(run, calls)` pair. `run` is timed as a whole unless it returns its own
+    duration, durations are divided by `calls` when set. Every run starts from the spec
+    registries left by the benchmark setup.
+
+    Args:
+        name (str): key of the benchmark in `BENCHMARKS`
+        routes (int): number of routes of the synthetic app
+        repeat (int): number of timed runs
+
+    Returns:
+        dict: benchmark result, durations are in seconds
+    """
+    durations = []
+    with isolated_registries():
+        run, calls = BENCHMARKS[name](routes)
+        for _ in range(repeat):
+            with isolated_registries():
+                start = time.perf_counter()
+                duration = run()
+                if not isinstance(duration, float):
+                    duration = time.perf_counter() - start
+            durations.append(duration / (calls or 1))
+    return dict(
+        name=name,
+        routes=routes,
+        unit="s",
+        min=min(durations),
+        median=statistics.median(durations),
+        max=max(durations),
+        runs=durations,
+    )
+
+
+def measure_peak_memory(routes):
+    """Measures the peak memory allocated while building and encoding the spec of an app
+
+    Args:
+        routes (int): number of routes of the synthetic app
+
+    Returns:
+        dict: benchmark result, the peak is in bytes
+    """
+    with isolated_registries():
+        client = make_app(routes).test_client()
+        tracemalloc.start()
+        try:
+            client.get("/docs/openapi.json")
+            client.get("/docs/openapi.yaml")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return dict(name="peak memory", routes=routes, unit="B", value=peak)
+
+
+def run_benchmarks(routes=ROUTES, repeat=3, names=None, echo=None):
+    """Runs the benchmarks on synthetic apps of each size
+
+    Args:
+        routes (tuple[int]): numbers of routes of the synthetic apps
+        repeat (int): number of timed runs of each benchmark
+        names (list[str]): benchmarks to run, all by default. Benchmarks the installed release
+            lacks the features of are skipped
+        echo (callable): called with a progress message before each benchmark
+
+    Returns:
+        dict: machine readable report, with the environment and one entry per benchmark and size
+    """
+    results = []
+    for size in routes:
+        for name in names or BENCHMARKS:
+            if not is_available(name):
+                if echo:
+                    echo(
+                        "{} routes: {} skipped, not supported by this release".format(size, name)
+                    )
+                continue
+            if echo:
+                echo("{} routes: {}".format(size, name))
+            results.append(time_benchmark(name, size, repeat))
+        if echo:
+            echo("{} routes: peak memory".format(size))
+        results.append(measure_peak_memory(size))
+    return dict(
+        flaskdoc=get_version(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        created=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        repeat=repeat,
+        results=results,
+    )
+
+
+def result_value(result):
+    return result["median"] if result["unit"] == "s" else result["value"]
+
+
+def find_regressions(report, baseline, tolerance):
+    """Compares a report against a baseline report
+
+    Args:
+        report (dict): report returned by `run_benchmarks`
+        baseline (dict): report of an earlier run
+        tolerance (float): allowed relative increase of a median time or peak memory
+
+    Returns:
+        list[tuple[dict, float]]: regressed results with their ratio to the baseline
+    """
+    previous = {(r["name"], r["routes"]): result_value(r) for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        base = previous.get((result["name"], result["routes"]))
+        if not base:
+            continue
+        ratio = result_value(result) / base
+        if ratio > 1 + tolerance:
+            regressions.append((result, ratio))
+    return regressions
+
+
+@click.command(name="benchmark")
+@click.option(
+    "--routes",
+    "-r",
+    type=int,
+    multiple=True,
+    default=ROUTES,
+    show_default=True,
+    help="Number of routes of a synthetic app, repeatable",
+)
+@click.option("--repeat", "-n", type=int, default=3, show_default=True, help="Timed runs")
+@click.option(
+    "--benchmark",
+    "-b",
+    "names",
+    type=click.Choice(list(BENCHMARKS)),
+    multiple=True,
+    help="Benchmark to run, repeatable, all by default",
+)
+@click.option("--output", "-o", type=click.File("w"), default="-", help="JSON report file")
+@click.option("--baseline", type=click.File("r"), help="JSON report of a previous run")
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.2,
+    show_default=True,
+    help="Allowed relative slowdown or memory growth over the baseline",
+)
+def benchmark(routes, repeat, names, output, baseline, tolerance):
+    """Benchmarks spec generation and serving, exits with 1 on regressions over BASELINE"""
+
+    report = run_benchmarks(routes, repeat, names, echo=lambda msg: click.echo(msg, err=True))
+    json.dump(report, output, indent=2)
+    output.write("\n")
+    if baseline is None:
+        return
+
+    regressions = find_regressions(report, json.load(baseline), tolerance)
+    for result, ratio in regressions:
+        click.echo(
+            "regression: {} with {} routes is {:.0%} of the baseline".format(
+                result["name"], result["routes"], ratio
+            ),
+            err=True,
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    benchmark()
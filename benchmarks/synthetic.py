@@ -0,0 +1,200 @@
+""" Synthetic API generator used by the benchmarks
+
+    Generates flask apps with any number of documented routes. Every resource gets a ``jo`` model
+    nesting a label model, a blueprint tagged after it and four routes covering query, path and
+    request body specs, so apps of different sizes only differ in scale.
+"""
+import flask
+
+from flaskdoc import jo, register_openapi, swagger
+from flaskdoc.swagger import schema
+
+# releases without per app schema factories register every schema in the process wide factory
+HAS_APP_FACTORIES = hasattr(swagger.SchemaFactory, "activate")
+
+# routes generated per resource
+ROUTES_PER_RESOURCE = 4
+INFO = swagger.Info(title="Synthetic API", version="1.0.0")
+
+
+def make_models(index):
+    """Creates the `jo` models of a resource
+
+    Args:
+        index (int): resource index, used to name the models
+
+    Returns:
+        tuple[type, type]: resource model and the model nested in it
+    """
+    label = jo.schema()(
+        type(
+            "Label{}".format(index),
+            (object,),
+            dict(
+                key=jo.string(required=True, min_length=1, max_length=64),
+                value=jo.string(example="blue"),
+            ),
+        )
+    )
+    resource = jo.schema(camel_case_props=True)(
+        type(
+            "Resource{}".format(index),
+            (object,),
+            dict(
+                id=jo.string(str_format="uuid", required=True),
+                name=jo.string(required=True, max_length=128),
+                quantity=jo.integer(minimum=0),
+                unit_price=jo.number(minimum=0),
+                active=jo.boolean(),
+                labels=jo.array(item=label),
+                owner=jo.object(item=label),
+            ),
+        )
+    )
+    return resource, label
+
+
+def make_resource(index):
+    """Creates a blueprint documenting the routes of a resource
+
+    Args:
+        index (int): resource index, used to name the blueprint, paths and models
+
+    Returns:
+        tuple[flask.Blueprint, type, type]: resource blueprint, its model and the nested model
+    """
+    name = "resource{}".format(index)
+    model, label = make_models(index)
+    blp = flask.Blueprint(name, __name__, url_prefix="/{}".format(name))
+    not_found = swagger.ResponseObject(description="not found")
+
+    @swagger.GET(
+        tags=[name],
+        operation_id="list{}".format(index),
+        summary="lists items",
+        parameters=[
+            swagger.QueryParameter(name="skip", schema=int),
+            swagger.QueryParameter(name="limit", schema=swagger.Integer(maximum=50)),
+        ],
+        responses={
+            "200": swagger.ResponseObject(
+                description="items", content=swagger.JsonType(schema=[model])
+            )
+        },
+    )
+    @blp.route("", methods=["GET"])
+    def list_items():
+        return flask.jsonify([])
+
+    @swagger.POST(
+        tags=[name],
+        operation_id="add{}".format(index),
+        summary="adds an item",
+        request_body=swagger.RequestBody(content=swagger.JsonType(schema=model), required=True),
+        responses={"201": swagger.ResponseObject(description="created")},
+    )
+    @blp.route("", methods=["POST"])
+    def add_item():
+        return flask.jsonify({}), 201
+
+    @swagger.GET(
+        tags=[name],
+        operation_id="get{}".format(index),
+        summary="gets an item",
+        responses={
+            "200": swagger.ResponseObject(
+                description="item", content=swagger.JsonType(schema=model)
+            ),
+            "404": not_found,
+        },
+    )
+    @blp.route("/<int:item_id>", methods=["GET"])
+    def get_item(item_id):
+        return flask.jsonify({})
+
+    @swagger.PUT(
+        tags=[name],
+        operation_id="update{}".format(index),
+        summary="updates an item",
+        request_body=swagger.RequestBody(content=swagger.JsonType(schema=model), required=True),
+        responses={"204": swagger.ResponseObject(description="updated"), "404": not_found},
+    )
+    @blp.route("/<uuid:item_id>/<path:version>", methods=["PUT"])
+    def update_item(item_id, version):
+        return "", 204
+
+    return blp, model, label
+
+
+def make_app(routes):
+    """Creates a documented flask app with a given number of routes
+
+    The app gets its own schema factory, apps built one after the other do not share schemas.
+    With releases predating per app factories the process wide factory is emptied instead.
+
+    Args:
+        routes (int): number of documented routes, rounded up to a multiple of
+            `ROUTES_PER_RESOURCE`
+
+    Returns:
+        flask.Flask: app registered with `register_openapi`, its models are listed in
+            `app.config["SYNTHETIC_MODELS"]` and the models nested in them in
+            `app.config["SYNTHETIC_LABELS"]`
+    """
+    app = flask.Flask(__name__)
+    if HAS_APP_FACTORIES:
+        factory = swagger.SchemaFactory()
+        with factory.activate():
+            add_resources(app, routes)
+        register_openapi(app, info=INFO, schema_factory=factory)
+    else:
+        reset_default_factory()
+        add_resources(app, routes)
+        register_openapi(app, info=INFO)
+    return app
+
+
+def add_resources(app, routes):
+    models, labels = [], []
+    for index in range(-(-routes // ROUTES_PER_RESOURCE)):
+        blp, model, label = make_resource(index)
+        app.register_blueprint(blp)
+        models.append(model)
+        labels.append(label)
+    app.config["SYNTHETIC_MODELS"] = models
+    app.config["SYNTHETIC_LABELS"] = labels
+
+
+def reset_default_factory():
+    """Empties the process wide schema registry, and the name keyed class cache of old releases"""
+
+    swagger.schema_factory.clear()
+    class_map = getattr(schema, "CLASS_MAP", None)
+    if class_map is not None:
+        class_map.clear()
+
+
+def make_items(app):
+    """Creates one instance of each resource model of a synthetic app
+
+    Args:
+        app (flask.Flask): app returned by `make_app`
+
+    Returns:
+        list: resource model instances
+    """
+    items = []
+    models = zip(app.config["SYNTHETIC_MODELS"], app.config["SYNTHETIC_LABELS"])
+    for index, (model, label) in enumerate(models):
+        items.append(
+            model(
+                id="00000000-0000-0000-0000-{:012d}".format(index),
+                name="item {}".format(index),
+                quantity=index,
+                unit_price=9.99,
+                active=True,
+                labels=[label(key="color", value="blue"), label(key="size")],
+                owner=label(key="owner", value="synthetic"),
+            )
+        )
+    return items
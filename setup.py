@@ -1,9 +1,45 @@
+import glob
+import gzip
 from os import path
 
 from setuptools import find_packages, setup
+from setuptools.command.build_py import build_py
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 here = path.abspath(path.dirname(__file__))
 
+# bundled swagger ui assets that get precompressed sidecars
+COMPRESSED_ASSETS = ["*.js", "*.css"]
+
+
+def compress_assets(directory):
+    """Writes .gz and, when brotli is installed, .br sidecars next to the static assets"""
+
+    for pattern in COMPRESSED_ASSETS:
+        for asset in glob.glob(path.join(directory, pattern)):
+            with open(asset, "rb") as f:
+                data = f.read()
+            # fixed mtime keeps the sidecars reproducible
+            with gzip.GzipFile(asset + ".gz", mode="wb", compresslevel=9, mtime=0) as f:
+                f.write(data)
+            if brotli is not None:
+                with open(asset + ".br", "wb") as f:
+                    f.write(brotli.compress(data))
+
+
+class BuildPy(build_py):
+    """Builds python modules and precompresses the bundled static assets"""
+
+    def run(self):
+        super(BuildPy, self).run()
+        if not self.dry_run:
+            compress_assets(path.join(self.build_lib, "flaskdoc", "static"))
+
+
 with open(path.join(here, "README.rst")) as f:
     long_description = f.read()
 
@@ -61,8 +97,10 @@ setup(
             "sphinxcontrib-napoleon",
         ],
         "rtd": ["sphinx", "sphinxcontrib-napoleon"],
+        "brotli": ["brotli"],
     },
     setup_requires=["setuptools_scm"],
+    cmdclass={"build_py": BuildPy},
     project_urls={"source": "https://github.com/kulgan/flaskdoc"},
     entry_points={"console_scripts": ["flaskdoc = flaskdoc.cli:flaskdoc"]},
 )
@@ -2,6 +2,15 @@
 
     Provides OpenAPI models, decorators and swagger ui
 """
-from flaskdoc.pallets import Blueprint, Flask, register_openapi
+from flaskdoc.pallets import (
+    Blueprint,
+    Flask,
+    add_stats_listener,
+    encode_models,
+    freeze,
+    register_openapi,
+    spec_ready,
+    validate_requests,
+)
 
 __version__ = "0.0.1a1"
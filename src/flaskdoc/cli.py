@@ -1,8 +1,11 @@
+import importlib
 import sys
 
 import click
+import flask
 
 from flaskdoc.examples.app import run_examples
+from flaskdoc.pallets.app import export_documents
 
 
 @click.group(name="flaskdoc")
@@ -24,7 +27,41 @@ def start_examples(name):
     run_examples(example=name)
 
 
+def locate_app(import_name):
+    """Imports a flask app from a `module:name` string
+
+    `name` can either be a flask app instance or a factory called without arguments, it defaults
+    to `create_app`.
+    """
+    module_name, _, name = import_name.partition(":")
+    module = importlib.import_module(module_name)
+    app = getattr(module, name or "create_app")
+    if not isinstance(app, flask.Flask):
+        app = app()
+    if not isinstance(app, flask.Flask):
+        raise click.BadParameter("{} is not a flask app".format(import_name))
+    return app
+
+
+@click.command(name="export")
+@click.argument("app")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False),
+    default="openapi",
+    help="Output directory",
+)
+def export(app, output):
+    """Writes the spec documents of APP, given as module:factory, to a directory"""
+
+    sys.path.insert(0, ".")
+    for file_path in export_documents(locate_app(app), output):
+        click.echo(file_path)
+
+
 flaskdoc.add_command(start_examples)
+flaskdoc.add_command(export)
 
 
 if __name__ == "__main__":
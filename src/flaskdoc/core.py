@@ -1,22 +1,60 @@
 """ Internal only functions and classes used by both swagger and flask specific customizations """
 
-import collections
+import collections.abc
 import json
+import operator
 
 import attr
 
 from flaskdoc.pallets import plugins
 
+# serializer field kinds
+_SKIP = 0
+_FIELD = 1
+_ACCESSOR = 2
+_EXTENSIONS = 3
+
+# values of these exact types are emitted as is
+_ATOMIC_TYPES = frozenset([str, int, float, bool])
+
+# compiled serializers and item iterators keyed by class
+_SERIALIZERS = {}
+_ITEM_ITERATORS = {}
+
 
 class DictMixin:
     """General usage mixin for handling nested dictionary conversion."""
 
+    __slots__ = ()
     _camel_case_fields_ = False
 
     def to_dict(self):
         """Converts object to dictionary"""
 
-        return self.parse(self.__dict__)
+        return get_serializer(type(self))(self)
+
+    def iter_items(self):
+        """Lazily yields the `(key, value)` pairs of `to_dict`, values are left unconverted"""
+
+        return get_item_iterator(type(self))(self)
+
+    def iter_parse(self, val):
+        """Lazy version of `parse`, yields `(key, value)` pairs with unconverted values"""
+
+        convert_to_came_case = val.get("_camel_case_fields_", False)
+        for k, v in val.items():
+            if k.startswith("__") or k == "_camel_case_fields_" or v is None:
+                continue
+            if k == "extensions":
+                for item in self.iter_parse(v):
+                    yield item
+                continue
+            if k == "ref":
+                k = "$ref"
+            if k.startswith("_"):
+                k = k[1:]
+                v = getattr(self, "q_" + k, None)
+            yield camel_case(k) if convert_to_came_case else k, v
 
     def parse(self, val):
         parsed = {}
@@ -48,7 +86,7 @@ class DictMixin:
             return val.to_dict()
         if isinstance(val, list):
             return [self._to_dict(v) for v in val]
-        if isinstance(val, collections.Mapping):
+        if isinstance(val, collections.abc.Mapping):
             return self.parse(val)
         if hasattr(val, "__dict__"):
             return self.parse(val.__dict__)
@@ -56,6 +94,187 @@ class DictMixin:
         return val
 
 
+def instance_values(obj):
+    """Returns the attributes of an instance as a dictionary
+
+    Slotted instances have no `__dict__`, their attrs fields are read first, in field order,
+    followed by the attributes of the instance `__dict__`, if any.
+
+    Args:
+        obj (object): instance
+
+    Returns:
+        dict: attribute values keyed by name, unset fields are None
+    """
+    values = {}
+    for attrib in getattr(type(obj), "__attrs_attrs__", ()):
+        values[attrib.name] = getattr(obj, attrib.name, None)
+    values.update(getattr(obj, "__dict__", ()))
+    return values
+
+
+def get_serializer(cls):
+    """Returns the serializer for instances of a class, compiling it on first use
+
+    Args:
+        cls (type): DictMixin derived class
+
+    Returns:
+        callable: function converting an instance of `cls` to a dictionary
+    """
+    serializer = _SERIALIZERS.get(cls)
+    if serializer is None:
+        serializer = _SERIALIZERS[cls] = compile_serializer(cls)
+    return serializer
+
+
+def get_item_iterator(cls):
+    """Returns the lazy `(key, value)` iterator for instances of a class, compiling it on first use
+
+    Args:
+        cls (type): DictMixin derived class
+
+    Returns:
+        callable: generator function yielding the items of an instance of `cls`
+    """
+    iterator = _ITEM_ITERATORS.get(cls)
+    if iterator is None:
+        iterator = _ITEM_ITERATORS[cls] = compile_item_iterator(cls)
+    return iterator
+
+
+def compile_plan(cls):
+    """Resolves the serialization plan of an attrs decorated class
+
+    The output key names, `q_*` accessors, `$ref` renaming and extension flattening are all
+    resolved once from `__attrs_attrs__`.
+
+    Args:
+        cls (type): DictMixin derived class
+
+    Returns:
+        tuple: one `(name, kind, key, camel_key, accessor)` entry per field, None if `cls` is not
+            attrs decorated
+    """
+    if "__attrs_attrs__" not in cls.__dict__:
+        return None
+
+    plan = []
+    for attrib in attr.fields(cls):
+        name = attrib.name
+        if name.startswith("__") or name == "_camel_case_fields_":
+            plan.append((name, _SKIP, None, None, None))
+            continue
+        if name == "extensions":
+            plan.append((name, _EXTENSIONS, None, None, None))
+            continue
+        key = "$ref" if name == "ref" else name
+        kind, accessor = _FIELD, None
+        if key.startswith("_"):
+            key = key[1:]
+            kind, accessor = _ACCESSOR, "q_" + key
+        plan.append((name, kind, key, camel_case(key), accessor))
+    return tuple(plan)
+
+
+def compile_serializer(cls):
+    """Builds a `to_dict` function specialized for an attrs decorated class
+
+    Everything but the value conversion is resolved once by `compile_plan`, field values are
+    read with a single `operator.attrgetter` call, which works for slotted and `__dict__` backed
+    fields alike. Classes that are not attrs decorated, and instances carrying attributes that are
+    not attrs fields, fall back to the generic `DictMixin.parse`.
+
+    Args:
+        cls (type): DictMixin derived class
+
+    Returns:
+        callable: function converting an instance of `cls` to a dictionary
+    """
+    plan = compile_plan(cls)
+    if plan is None:
+        return _parse_instance
+    get_values, field_names = _compile_getter(plan)
+
+    def to_dict(obj):
+        extra = getattr(obj, "__dict__", None)
+        if extra and not field_names.issuperset(extra):
+            return obj.parse(instance_values(obj))
+
+        values = get_values(obj)
+        convert_to_camel_case = getattr(obj, "_camel_case_fields_", False)
+        parsed = {}
+        for (name, kind, key, camel_key, accessor), v in zip(plan, values):
+            if v is None or kind == _SKIP:
+                continue
+            if kind == _EXTENSIONS:
+                parsed.update(obj.parse(v))
+                continue
+            if kind == _ACCESSOR:
+                v = getattr(obj, accessor, None)
+            if convert_to_camel_case:
+                key = camel_key
+            parsed[key] = v if type(v) in _ATOMIC_TYPES else obj._to_dict(v)
+        return parsed
+
+    return to_dict
+
+
+def compile_item_iterator(cls):
+    """Builds an `iter_items` generator function specialized for an attrs decorated class
+
+    Args:
+        cls (type): DictMixin derived class
+
+    Returns:
+        callable: generator function yielding the items of an instance of `cls`
+    """
+    plan = compile_plan(cls)
+    if plan is None:
+        return _iter_parse_instance
+    get_values, field_names = _compile_getter(plan)
+
+    def iter_items(obj):
+        extra = getattr(obj, "__dict__", None)
+        if extra and not field_names.issuperset(extra):
+            for item in obj.iter_parse(instance_values(obj)):
+                yield item
+            return
+
+        values = get_values(obj)
+        convert_to_camel_case = getattr(obj, "_camel_case_fields_", False)
+        for (name, kind, key, camel_key, accessor), v in zip(plan, values):
+            if v is None or kind == _SKIP:
+                continue
+            if kind == _EXTENSIONS:
+                for item in obj.iter_parse(v):
+                    yield item
+                continue
+            if kind == _ACCESSOR:
+                v = getattr(obj, accessor, None)
+            yield camel_key if convert_to_camel_case else key, v
+
+    return iter_items
+
+
+def _compile_getter(plan):
+    """Returns a function reading every field of a plan as a tuple, and the set of field names"""
+
+    names = [entry[0] for entry in plan]
+    getter = operator.attrgetter(*names)
+    if len(names) == 1:
+        return lambda obj: (getter(obj),), frozenset(names)
+    return getter, frozenset(names)
+
+
+def _parse_instance(obj):
+    return obj.parse(instance_values(obj))
+
+
+def _iter_parse_instance(obj):
+    return obj.iter_parse(instance_values(obj))
+
+
 def camel_case(snake_case):
     """Converts snake case strings to camel case
 
@@ -72,12 +291,14 @@ def camel_case(snake_case):
 class ApiDecoratorMixin(object):
     """Makes a model a decorator that registers itself"""
 
+    __slots__ = ()
+
     def __call__(self, func):
         plugins.register_spec(func, self)
         return func
 
 
-@attr.s
+@attr.s(slots=True)
 class ModelMixin(DictMixin):
     """Swagger Model mixin that provides common methods like to dict and to json"""
 
@@ -96,8 +317,14 @@ class ModelMixin(DictMixin):
 
 
 class ExtensionMixin(ModelMixin):
+    """Model allowing `x-` extensions, held in an `extensions` field
+
+    Subclasses declare the field themselves, defaulting to None, the dictionary is only allocated
+    by the first `add_extension` call.
+    """
 
-    extensions = attr.ib(default={})
+    __slots__ = ()
+    extensions = attr.ib(default=None)
 
     def add_extension(self, name, value):
         """Allows extensions to the Swagger Schema.
@@ -2,6 +2,13 @@
 
 
 """
+import datetime
+import decimal
+import enum
+import json
+import math
+import uuid
+
 import attr
 
 from flaskdoc.core import camel_case
@@ -13,11 +20,18 @@ from flaskdoc.swagger import (
     Object,
     Schema,
     String,
-    schema_factory,
 )
+from flaskdoc.swagger.schema import get_schema_factory, intern_schema
 
 JO_SCHEMA = "__jo__"
 JO_REQUIRED = "__jo__required__"
+JO_CAMEL_CASE = "__jo__camel_case__"
+JO_ITEM = "__jo__item__"
+JO_TYPES = "__jo__types__"
+
+# compiled json encoders and loaders keyed by class
+_ENCODERS = {}
+_LOADERS = {}
 
 
 def schema(
@@ -57,6 +71,7 @@ def schema(
     def wraps(cls):
         req = required or []
         setattr(cls, "additional_properties", additional_properties)
+        setattr(cls, JO_CAMEL_CASE, camel_case_props)
 
         def jo_schema(cls):
             sc = Object(
@@ -80,6 +95,8 @@ def schema(
             return sc
 
         setattr(cls, "jo_schema", classmethod(jo_schema))
+        if "from_dict" not in cls.__dict__:
+            setattr(cls, "from_dict", classmethod(load))
         return attr.s(cls)
 
     return wraps
@@ -95,6 +112,7 @@ def string(
     example=None,
     description=None,
     xml=None,
+    pattern=None,
 ):
     """Creates a json schema of type string
 
@@ -108,6 +126,7 @@ def string(
         example (str): Examole string
         description (str): Property description
         xml (str|flaskdoc.swagger.XML): xml name of XML object instance
+        pattern (str): regular expression the string must match
 
     Returns:
         attr.ib: field definition
@@ -116,11 +135,13 @@ def string(
         format=str_format,
         min_length=min_length,
         max_length=max_length,
+        pattern=pattern,
         enum=enum,
         example=example,
         description=description,
         xml=xml,
     )
+    sc = intern_schema(sc)
     return attr.ib(type=str, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
 
 
@@ -160,6 +181,7 @@ def number(
         description=description,
         xml=xml,
     )
+    sc = intern_schema(sc)
     return attr.ib(type=float, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
 
 
@@ -193,6 +215,7 @@ def integer(
         exclusive_maximum=exclusive_max,
         xml=xml,
     )
+    sc = intern_schema(sc)
     return attr.ib(type=float, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
 
 
@@ -208,15 +231,15 @@ def one_of(types, default=None, discriminator=None, description=None):
     Returns:
         attr.ib: field instance
     """
-    items = [schema_factory.get_schema(cls) for cls in types]
+    items = [get_schema_factory().get_schema(cls) for cls in types]
     sc = Schema(one_of=items, discriminator=discriminator, description=description)
-    return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc})
+    return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc, JO_TYPES: types})
 
 
 def all_of(types, default=None, discriminator=None, description=None):
     """JSON schema allOf"""
 
-    items = [schema_factory.get_schema(cls) for cls in types]
+    items = [get_schema_factory().get_schema(cls) for cls in types]
     sc = Schema(all_of=items, discriminator=discriminator, description=description)
     return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc})
 
@@ -224,9 +247,9 @@ def all_of(types, default=None, discriminator=None, description=None):
 def any_of(types, default=None, discriminator=None):
     """JSON schema anyOf"""
 
-    items = [schema_factory.get_schema(cls) for cls in types]
+    items = [get_schema_factory().get_schema(cls) for cls in types]
     sc = Schema(any_of=items, discriminator=discriminator)
-    return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc})
+    return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc, JO_TYPES: types})
 
 
 def boolean(
@@ -251,6 +274,7 @@ def boolean(
         attr.ib:
     """
     sc = Boolean(read_only=read_only, write_only=write_only, description=description, xml=xml)
+    sc = intern_schema(sc)
     return attr.ib(type=bool, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
 
 
@@ -267,11 +291,393 @@ def array(
     sc = Array(
         items=item, min_items=min_items, max_items=max_items, unique_items=unique_items, xml=xml
     )
-    return attr.ib(type=list, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
+    return attr.ib(
+        type=list,
+        default=default,
+        metadata={JO_SCHEMA: sc, JO_REQUIRED: required, JO_ITEM: item},
+    )
 
 
 def object(item, default=None, required=None, description=None):
     """Raw object data type"""
 
-    sc = schema_factory.get_schema(item, description=description)
+    sc = get_schema_factory().get_schema(item, description=description)
     return attr.ib(type=item, default=default, metadata={JO_SCHEMA: sc, JO_REQUIRED: required})
+
+
+def dumps(value):
+    """Encodes a value holding `jo.schema` models to JSON bytes
+
+    Models are encoded by per class encoders compiled from their schema: properties are named as
+    advertised in the spec, `camel_case_props` included, write only properties are left out and
+    None values are skipped. Nested models, lists, dicts, enums, dates and uuids are handled.
+
+    Args:
+        value (object): model instance, list of model instances or any JSON compatible value
+
+    Returns:
+        bytes: UTF-8 encoded JSON document
+
+    Example:
+        .. code-block::
+
+            @app.route("/inventory")
+            def search_inventory():
+                items = [InventoryItem(...), InventoryItem(...)]
+                return flask.Response(jo.dumps(items), mimetype="application/json")
+    """
+    parts = []
+    _encode_value(value, parts)
+    return "".join(parts).encode("utf-8")
+
+
+def load(cls, data):
+    """Creates a model instance from decoded JSON data
+
+    Each class gets a constructor compiled once: JSON keys, snake or camel cased, are mapped to
+    attrs fields, missing fields take their defaults, `jo.object` and `jo.array` properties holding
+    models are loaded recursively and `jo.one_of` properties pick their type by discriminator.
+    Unknown keys are ignored. Also available as `Model.from_dict(data)` on `jo.schema` classes.
+
+    Args:
+        cls (type): `jo.schema` or attrs decorated class
+        data (dict|list[dict]): decoded JSON object, or list of objects
+
+    Returns:
+        object|list[object]: model instance, list of instances if `data` is a list
+
+    Raises:
+        TypeError: if `data` is not a JSON object
+    """
+    if isinstance(data, list):
+        loader = get_loader(cls)
+        return [loader(item) for item in data]
+    return get_loader(cls)(data)
+
+
+def get_loader(cls):
+    """Returns the compiled constructor of an attrs class, compiling it on first use
+
+    Args:
+        cls (type): `jo.schema` or attrs decorated class
+
+    Returns:
+        callable: function creating an instance of `cls` from a dict
+    """
+    loader = _LOADERS.get(cls)
+    if loader is None:
+        loader = _LOADERS[cls] = compile_loader(cls)
+    return loader
+
+
+def compile_loader(cls):
+    """Builds a constructor specialized for an attrs class
+
+    Args:
+        cls (type): `jo.schema` or attrs decorated class
+
+    Returns:
+        callable: function creating an instance of `cls` from a dict
+    """
+    fields = {}
+    for attrib in attr.fields(cls):
+        if not attrib.init:
+            continue
+        argument = getattr(attrib, "alias", None) or attrib.name.lstrip("_")
+        field = (argument, _field_loader(attrib))
+        # both naming styles are accepted, whatever camel_case_props is, and private fields are
+        # loaded from their constructor argument as well
+        for name in (attrib.name, argument):
+            fields[camel_case(name)] = field
+            fields[name] = field
+
+    def load_instance(data):
+        if not isinstance(data, dict):
+            raise TypeError("Cannot load {} from {}".format(cls.__name__, type(data).__name__))
+        kwargs = {}
+        for key, value in data.items():
+            field = fields.get(key)
+            if field is None:
+                continue
+            argument, load_field = field
+            kwargs[argument] = value if load_field is None or value is None else load_field(value)
+        return cls(**kwargs)
+
+    load_instance.keys = frozenset(fields)
+    return load_instance
+
+
+def _field_loader(attrib):
+    metadata = attrib.metadata
+    if JO_TYPES in metadata:
+        return _union_loader(metadata[JO_TYPES], metadata[JO_SCHEMA].discriminator)
+    item = metadata.get(JO_ITEM)
+    if isinstance(item, type) and attr.has(item):
+        load_item = _nested_loader(item)
+        return lambda value: [load_item(v) for v in value]
+    if isinstance(attrib.type, type):
+        if attr.has(attrib.type):
+            return _nested_loader(attrib.type)
+        if issubclass(attrib.type, enum.Enum):
+            return attrib.type
+    return None
+
+
+def _nested_loader(cls):
+    # resolved on call, models may refer to each other
+    def load_nested(value):
+        return get_loader(cls)(value)
+
+    return load_nested
+
+
+def _union_loader(types, discriminator):
+    """Loads values of `jo.one_of` and `jo.any_of` properties
+
+    With a discriminator the type is looked up from the discriminating property, by the
+    discriminator mapping or else by class name. Without one, the first type accepting all keys
+    of the value is used. Like nested models, member loaders are resolved on call, so unions may
+    refer to their own class or to classes listed after the field is declared.
+    """
+    if isinstance(discriminator, str):
+        property_name, mapping = discriminator, {}
+    else:
+        property_name = getattr(discriminator, "property_name", None)
+        mapping = getattr(discriminator, "mapping", None)
+        mapping = mapping if isinstance(mapping, dict) else {}
+
+    resolved = {}
+
+    def resolve():
+        # on first call, once every class of the union is defined
+        if not resolved:
+            classes = [cls for cls in types if isinstance(cls, type) and attr.has(cls)]
+            by_name = {cls.__name__: cls for cls in classes}
+            by_value = dict(by_name)
+            for value, ref in mapping.items():
+                name = ref.rsplit("/", 1)[-1]
+                if name in by_name:
+                    by_value[value] = by_name[name]
+            resolved.update(classes=classes, by_value=by_value)
+        return resolved
+
+    if property_name:
+
+        def load_discriminated(value):
+            by_value = resolve()["by_value"]
+            cls = by_value.get(value.get(property_name)) if isinstance(value, dict) else None
+            return value if cls is None else get_loader(cls)(value)
+
+        return load_discriminated
+
+    def load_matching(value):
+        if isinstance(value, dict):
+            for cls in resolve()["classes"]:
+                load_value = get_loader(cls)
+                if load_value.keys.issuperset(value):
+                    return load_value(value)
+        return value
+
+    return load_matching
+
+
+def is_model(value):
+    """Checks if a value is a `jo.schema` model instance, or a list or tuple of them
+
+    Only the value and the first item of a list run the check, so responses without models are
+    not scanned. Lists whose first item is a model are encoded whole by `dumps`.
+    """
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    return hasattr(type(value), "jo_schema")
+
+
+def get_encoder(cls):
+    """Returns the JSON encoder of an attrs class, compiling it on first use
+
+    Args:
+        cls (type): `jo.schema` or attrs decorated class
+
+    Returns:
+        callable: function appending the JSON parts of an instance to a list
+    """
+    encoder = _ENCODERS.get(cls)
+    if encoder is None:
+        encoder = _ENCODERS[cls] = compile_encoder(cls)
+    return encoder
+
+
+def compile_encoder(cls):
+    """Builds a JSON encoder specialized for an attrs class
+
+    Output keys and the encoder of each property are resolved once from the property schemas.
+
+    Args:
+        cls (type): `jo.schema` or attrs decorated class
+
+    Returns:
+        callable: function appending the JSON parts of an instance to a list
+    """
+    use_camel_case = getattr(cls, JO_CAMEL_CASE, False)
+    plan = []
+    for attrib in attr.fields(cls):
+        sc = attrib.metadata.get(JO_SCHEMA)
+        if sc is not None and sc.write_only:
+            continue
+        name = camel_case(attrib.name) if use_camel_case else attrib.name
+        key = _encode_string(name) + ":"
+        encode_field = _FIELD_ENCODERS.get(sc and sc.type, _encode_value)
+        plan.append((attrib.name, "{" + key, "," + key, encode_field))
+    plan = tuple(plan)
+
+    def encode(obj, parts):
+        first = True
+        for name, first_key, key, encode_field in plan:
+            v = getattr(obj, name)
+            if v is None:
+                continue
+            if first:
+                parts.append(first_key)
+                first = False
+            else:
+                parts.append(key)
+            encode_field(v, parts)
+        parts.append("{}" if first else "}")
+
+    return encode
+
+
+_encode_string = json.encoder.encode_basestring
+
+
+def _encode_float(value):
+    if math.isfinite(value):
+        return float.__repr__(value)
+    # not representable in JSON
+    return "null"
+
+
+def _encode_value(value, parts):
+    encode = _VALUE_ENCODERS.get(type(value))
+    if encode is None:
+        encode = _resolve_value_encoder(type(value))
+    encode(value, parts)
+
+
+def _resolve_value_encoder(value_type):
+    if attr.has(value_type):
+        encode = get_encoder(value_type)
+    elif issubclass(value_type, enum.Enum):
+        encode = _encode_enum
+    elif issubclass(value_type, dict):
+        encode = _encode_dict
+    elif issubclass(value_type, (list, tuple, set, frozenset)):
+        encode = _encode_list
+    elif issubclass(value_type, (datetime.date, datetime.time)):
+        encode = _encode_date
+    elif issubclass(value_type, (uuid.UUID, decimal.Decimal, str)):
+        encode = _encode_str
+    else:
+        raise TypeError("Object of type {} is not JSON serializable".format(value_type.__name__))
+    _VALUE_ENCODERS[value_type] = encode
+    return encode
+
+
+def _encode_str(value, parts):
+    parts.append(_encode_string(str(value)))
+
+
+def _encode_none(value, parts):
+    parts.append("null")
+
+
+def _encode_bool(value, parts):
+    parts.append("true" if value else "false")
+
+
+def _encode_int(value, parts):
+    parts.append(int.__repr__(value))
+
+
+def _encode_float_value(value, parts):
+    parts.append(_encode_float(value))
+
+
+def _encode_list(value, parts):
+    separator = "["
+    for item in value:
+        parts.append(separator)
+        _encode_value(item, parts)
+        separator = ","
+    parts.append("[]" if separator == "[" else "]")
+
+
+def _encode_dict(value, parts):
+    separator = "{"
+    for k, v in value.items():
+        parts.append(separator)
+        parts.append(_encode_string(str(k)))
+        parts.append(":")
+        _encode_value(v, parts)
+        separator = ","
+    parts.append("{}" if separator == "{" else "}")
+
+
+def _encode_enum(value, parts):
+    _encode_value(value.value, parts)
+
+
+def _encode_date(value, parts):
+    parts.append(_encode_string(value.isoformat()))
+
+
+# value encoders keyed by exact type, extended on first use of other types
+_VALUE_ENCODERS = {
+    str: lambda value, parts: parts.append(_encode_string(value)),
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float_value,
+    list: _encode_list,
+    tuple: _encode_list,
+    dict: _encode_dict,
+}
+
+
+def _encode_string_field(value, parts):
+    if type(value) is str:
+        parts.append(_encode_string(value))
+    else:
+        _encode_value(value, parts)
+
+
+def _encode_integer_field(value, parts):
+    if type(value) is int:
+        parts.append(int.__repr__(value))
+    elif type(value) is float and value.is_integer():
+        parts.append(int.__repr__(int(value)))
+    else:
+        _encode_value(value, parts)
+
+
+def _encode_number_field(value, parts):
+    if type(value) is float:
+        parts.append(_encode_float(value))
+    else:
+        _encode_value(value, parts)
+
+
+def _encode_boolean_field(value, parts):
+    if type(value) is bool:
+        parts.append("true" if value else "false")
+    else:
+        _encode_value(value, parts)
+
+
+# property encoders keyed by schema type, other properties are encoded by their value type
+_FIELD_ENCODERS = {
+    "string": _encode_string_field,
+    "integer": _encode_integer_field,
+    "number": _encode_number_field,
+    "boolean": _encode_boolean_field,
+}
@@ -1,2 +1,10 @@
-from flaskdoc.pallets.app import Flask, register_openapi
+from flaskdoc.pallets.app import (
+    Flask,
+    add_stats_listener,
+    encode_models,
+    freeze,
+    register_openapi,
+    spec_ready,
+)
 from flaskdoc.pallets.blueprints import Blueprint
+from flaskdoc.pallets.validation import ValidationError, validate_requests
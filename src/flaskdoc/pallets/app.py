@@ -1,15 +1,26 @@
 import functools
+import gc
 import inspect
-import json
+import threading
 
+import attr
 import flask
 import pkg_resources
-import yaml
+from werkzeug import routing
 
-from flaskdoc import swagger
-from flaskdoc.pallets import plugins
+from flaskdoc import jo, swagger
+from flaskdoc.pallets import (
+    assets,
+    documents,
+    extraction,
+    plugins,
+    profiles,
+    slices,
+    stats,
+)
 from flaskdoc.pallets.blueprints import Blueprint
 from flaskdoc.pallets.mixin import SwaggerMixin
+from flaskdoc.swagger.schema import intern_schema
 
 API_DOCS = {}
 static_ui = pkg_resources.resource_filename("flaskdoc", "static")
@@ -22,6 +33,10 @@ ui = flask.Blueprint(
 )
 
 CONFIG = {}
+# cache key of the documents served by the `Flask` subclass itself, eg `app.json`
+APP_DOCUMENT_KEY = "app.{}"
+# typed path parameters keyed by rule and converter types
+PATH_PARAMETERS = {}
 
 
 class Flask(flask.Flask, SwaggerMixin):
@@ -47,6 +62,7 @@ class Flask(flask.Flask, SwaggerMixin):
         )
 
         self._doc = None
+        self._paths = swagger.Paths()
         self.open_api_version = open_api_version
         self.api_title = api_title
         self.api_version = version
@@ -72,26 +88,35 @@ class Flask(flask.Flask, SwaggerMixin):
         self._doc = swagger.OpenApi(
             version=self.open_api_version,
             info=info_block,
-            paths=swagger.Paths(),
+            paths=self._paths,
         )
         self.add_url_rule("/openapi.json", view_func=self.register_json_path, methods=["GET"])
         self.add_url_rule("/openapi.yaml", view_func=self.register_yaml_path, methods=["GET"])
 
     def register_json_path(self):
-        return flask.jsonify(self._doc.dict()), 200
+        return self.send_spec_document("json")
 
     def register_yaml_path(self):
-        fk = json.dumps(self._doc.dict())
-        return flask.Response(yaml.safe_dump(json.loads(fk)), mimetype="application/yaml")
+        return self.send_spec_document("yaml")
+
+    def send_spec_document(self, name):
+        return documents.send_document(self.encode_spec_document(name))
+
+    def encode_spec_document(self, name):
+        encoder = functools.partial(documents.ENCODERS[name], self._doc)
+        # own keys, apps also registered with `register_openapi` cache the ui documents as well
+        return documents.get_document(self, APP_DOCUMENT_KEY.format(name), encoder)
 
     def route(self, rule, ref=None, description=None, summary=None, **options):
         self.init_swagger()
+        documents.clear_documents(self)
 
         options = self.parse_route(rule, ref, description, summary, **options)
         return super(Flask, self).route(rule, **options)
 
     def register_blueprint(self, blueprint, **options):
         self.init_swagger()
+        documents.clear_documents(self)
 
         url_prefix = options.get("url_prefix")
         if isinstance(blueprint, Blueprint):
@@ -99,18 +124,136 @@ class Flask(flask.Flask, SwaggerMixin):
             self._doc.add_paths(blueprint.paths, url_prefix or blueprint.url_prefix)
         return super(Flask, self).register_blueprint(blueprint, **options)
 
+    def make_response(self, rv):
+        """Extends flask make_response, encodes `jo.schema` models returned by views
+
+        Models, and lists starting with a model, are encoded with their compiled `jo.dumps`
+        encoders, views of plain flask apps get the same with `encode_models`
+        """
+        return super(Flask, self).make_response(encode_model_response(rv))
+
+
+def encode_model_response(rv):
+    """Encodes the body of a view return value with `jo.dumps` if it is a `jo.schema` model
+
+    Args:
+        rv (object): view return value, a body or a `(body, status, headers)` like tuple
+
+    Returns:
+        object: `rv` with a JSON response as body if `jo.is_model` accepts it, `rv` itself
+            otherwise
+    """
+    body = rv[0] if isinstance(rv, tuple) else rv
+    if not jo.is_model(body):
+        return rv
+    body = flask.Response(jo.dumps(body), mimetype="application/json")
+    return (body,) + rv[1:] if isinstance(rv, tuple) else body
+
+
+def encode_models(view):
+    """Decorates a view of a plain flask app to encode the `jo.schema` models it returns
+
+    Apps created with `flaskdoc.Flask` encode models without it. Specs registered on the view
+    before it is decorated are kept, swagger decorators may be applied before or after.
+
+    Example:
+        .. code-block::
+
+            @app.route("/inventory")
+            @swagger.GET(responses={"200": swagger.ResponseObject(...)})
+            @encode_models
+            def search_inventory():
+                return [InventoryItem(...), InventoryItem(...)]
+
+    Args:
+        view (callable): view function
+
+    Returns:
+        callable: view function returning JSON responses in place of models
+    """
+
+    @functools.wraps(view)
+    def encoding_view(*args, **kwargs):
+        return encode_model_response(view(*args, **kwargs))
+
+    if view in plugins.API_SPECS:
+        # share the spec list, specs registered on either function document both
+        plugins.API_SPECS[encoding_view] = plugins.API_SPECS[view]
+        plugins.SPEC_LOG.append(encoding_view)
+    return encoding_view
+
 
 @ui.route("/openapi.json", methods=["GET"])
 def json_path():
-    get_api_docs(flask.current_app)
-    return flask.jsonify(flask.current_app.openapi.to_dict()), 200
+    return send_spec(flask.current_app, "json")
 
 
 @ui.route("/openapi.yaml", methods=["GET"])
 def yaml_path():
-    get_api_docs(flask.current_app)
-    fk = json.dumps(flask.current_app.openapi.to_dict())
-    return flask.Response(yaml.safe_dump(json.loads(fk)), mimetype="application/yaml")
+    return send_spec(flask.current_app, "yaml")
+
+
+@ui.route("/openapi/<blueprint>.<any(json, yaml):name>", methods=["GET"])
+def blueprint_path(blueprint, name):
+    return send_spec(flask.current_app, name, blueprint=blueprint)
+
+
+def send_spec(app, name, blueprint=None):
+    """Sends the api docs of an app, the `tag` and `profile` query arguments pick a variant"""
+
+    tag = None if blueprint else flask.request.args.get("tag")
+    profile = flask.request.args.get("profile")
+    if profile is not None and profile not in profiles.PROFILES:
+        flask.abort(404)
+    if tag or blueprint:
+        document = get_spec_slice(app, name, tag=tag, blueprint=blueprint, profile=profile)
+    elif name == "json" and profile is None and can_stream(app):
+        get_api_docs(app)
+        with documents.get_state(app)["lock"]:
+            api = snapshot_spec(app.openapi)
+        return documents.stream_document(api)
+    else:
+        document = get_spec_document(app, name, profile)
+    if document is None:
+        flask.abort(404)
+    max_age = documents.get_state(app).get("cache_max_age")
+    return documents.send_document(document, max_age=max_age)
+
+
+def can_stream(app):
+    """Tells whether `openapi.json` is streamed, transforms of the spec dictionary need it whole
+
+    Args:
+        app (flask.Flask): flask app instance
+
+    Returns:
+        bool: True if `stream` is set and the spec is neither prebuilt nor transformed
+    """
+    state = documents.get_state(app)
+    return bool(state.get("stream") and not state.get("prebuilt") and not state.get("transforms"))
+
+
+def snapshot_spec(api):
+    """Copies the mappings of an api spec incremental builds update, for streaming outside the lock
+
+    Args:
+        api (swagger.OpenApi): api spec
+
+    Returns:
+        swagger.OpenApi: spec sharing its path items and schemas with `api`
+    """
+    components = api.components
+    if components is not None and components.schemas:
+        components = attr.evolve(components, schemas=dict(components.schemas))
+    return swagger.OpenApi(
+        info=api.info,
+        paths=swagger.Paths(items=swagger.SwaggerDict(api.paths.items)),
+        version=api.openapi,
+        tags=list(api.tags),
+        servers=list(api.servers),
+        external_docs=api.external_docs,
+        components=components,
+    )
 
 
 @ui.route("/<path:path>", methods=["GET"])
@@ -118,7 +261,31 @@ def static_resources(path="default.html"):
     if path == "default.html":
         template = "redoc.html" if CONFIG["use_redoc"] else "index.html"
         return flask.render_template(template, path=CONFIG["path"])
-    return flask.send_from_directory(static_ui, path)
+    return assets.send_asset(static_ui, path)
+
+
+@ui.context_processor
+def inject_asset_url():
+    return dict(asset_url=functools.partial(assets.asset_url, static_ui))
+
+
+@ui.route("/_ready", methods=["GET"])
+def ready():
+    """Readiness probe, responds with `503` until the spec was built"""
+
+    is_ready = spec_ready(flask.current_app)
+    return flask.jsonify(ready=is_ready), 200 if is_ready else 503
+
+
+@ui.route("/_stats", methods=["GET"])
+def build_stats():
+    """Serves the records of the app's `stats.StatsCollector` listener, `404` without one"""
+
+    listeners = documents.get_state(flask.current_app).get("stats_listeners", ())
+    for listener in listeners:
+        if isinstance(listener, stats.StatsCollector):
+            return flask.jsonify(records=listener.records())
+    flask.abort(404)
 
 
 @ui.route("/", methods=["GET"])
@@ -137,6 +304,14 @@ def register_openapi(
     docs_path="/docs",
     use_redoc=False,
     links=None,
+    cache_max_age=None,
+    prebuilt=None,
+    stream=False,
+    schema_factory=None,
+    warm_up=False,
+    stats_listeners=None,
+    prune_components=False,
+    extract_components=None,
 ):
     """Registers flaskdoc api specs to an existing flask app
 
@@ -150,6 +325,25 @@ def register_openapi(
         docs_path (str): custom path name for the swagger ui docs, defaults to docs
         use_redoc (bool): disable normal swagger ui and use redoc ui instead
         links (dict[str, swagger.Link]): reusable links mapping
+        cache_max_age (int): seconds clients may cache the spec documents for, by default clients
+            revalidate using the document ETag on every request
+        prebuilt (str): directory written by ``flaskdoc export``, when set the spec documents are
+            served from memory mapped files in it and never built by this app
+        stream (bool): encode ``openapi.json`` while sending it instead of caching the encoded
+            document, meant for very large specs. Ignored with ``extract_components``, which
+            needs the whole spec dictionary
+        schema_factory (swagger.SchemaFactory): schema registry of this app's spec, defaults to
+            the process wide ``swagger.schema_factory``
+        warm_up (bool): build and encode the spec in a background thread right away, requests
+            arriving before it finishes wait for it. Register all routes and blueprints first,
+            readiness is reported by ``spec_ready`` and the ``<docs_path>/_ready`` endpoint
+        stats_listeners (list[callable]): functions called with the `stats.BuildStats` of every
+            spec build and document encoding, see `add_stats_listener`
+        prune_components (bool): leave component schemas that are not referenced from any path,
+            directly or through other components, out of the spec, see `get_pruned_schemas`
+        extract_components (int): move inline responses, parameters and schemas repeated in the
+            encoded documents to the components when their compact JSON encoding is at least
+            this many bytes, disabled if None
     """
     docs_path = docs_path or "docs"
     CONFIG["use_redoc"] = use_redoc
@@ -167,38 +361,707 @@ def register_openapi(
         tags=tags,
         components=components,
     )
+    state = documents.get_state(app)
+    state["schema_factory"] = schema_factory or swagger.schema_factory
+    state["prune_components"] = prune_components
+    state["cache_max_age"] = cache_max_age
+    state["stream"] = stream
+    state["transforms"] = []
+    if extract_components is not None:
+        state["transforms"].append(
+            functools.partial(extraction.extract_components, threshold=extract_components)
+        )
+    for listener in stats_listeners or ():
+        add_stats_listener(app, listener)
+    if prebuilt:
+        state["documents"].update(documents.load_documents(prebuilt))
+        state["prebuilt"] = True
+        state["ready"].set()
+    elif warm_up:
+        start_warm_up(app)
+
+
+def add_stats_listener(app, listener):
+    """Registers a listener of the phase level measurements of an app's spec builds
+
+    Listeners are called with a `stats.BuildStats` after every spec build and document encoding.
+    `stats.log_stats` logs them and a `stats.StatsCollector` keeps them for the
+    ``<docs_path>/_stats`` endpoint.
+
+    Example:
+        .. code-block::
+
+            add_stats_listener(app, stats.log_stats)
+            add_stats_listener(app, lambda build: statsd.timing(build.name, build.wall_time))
+
+    Args:
+        app (flask.Flask): flask app instance
+        listener (callable): function called with a `stats.BuildStats`
+    """
+    documents.get_state(app).setdefault("stats_listeners", []).append(listener)
+
+
+def start_warm_up(app):
+    """Builds and encodes the api docs of an app in a background thread
+
+    Args:
+        app (flask.Flask): flask app instance, registered with `register_openapi`
+
+    Returns:
+        threading.Thread: started daemon thread
+    """
+    thread = threading.Thread(target=build_documents, args=(app,), name="flaskdoc-warm-up")
+    thread.daemon = True
+    # readiness is reported by the warm up once every document is encoded
+    documents.get_state(app)["warm_up"] = thread
+    thread.start()
+    return thread
+
+
+def build_documents(app):
+    """Builds the api docs of an app and encodes every document format
+
+    Failures are logged, the docs are then built by the next request as usual.
+
+    Args:
+        app (flask.Flask): flask app instance, registered with `register_openapi`
+
+    Returns:
+        bool: True if all documents were built
+    """
+    state = documents.get_state(app)
+    try:
+        with app.app_context():
+            for name in documents.ENCODERS:
+                get_spec_document(app, name)
+    except Exception:
+        app.logger.exception("Building the api docs failed")
+        # leave readiness to request time builds
+        state.pop("warm_up", None)
+        return False
+    state["ready"].set()
+    return True
+
+
+def spec_ready(app):
+    """Checks if the api docs of an app were built, by warm up or by a first request
+
+    Args:
+        app (flask.Flask): flask app instance
+
+    Returns:
+        bool: True once the api docs can be served without building them
+    """
+    return documents.get_state(app)["ready"].is_set()
+
+
+class SpecBuilder(object):
+    """Incrementally builds the api docs of an app
+
+    Keeps track of the spec registrations, url rules and schemas seen by the previous build, so
+    subsequent builds only patch the paths and components that changed in between. With
+    `prune_components`, only the schemas reachable from the paths are kept in the components,
+    every registered schema is tracked so schemas pruned earlier come back once referenced.
+    """
+
+    def __init__(self, schema_factory, prune_components=False):
+        self.schema_factory = schema_factory
+        self.prune_components = prune_components
+        self.built = False
+        self.spec_revision = 0
+        self.rule_count = 0
+        self.schema_revision = 0
+        # view functions of the app, their revision and a copy as of the last build
+        self.view_functions = None
+        self.view_revision = None
+        self.view_snapshot = {}
+        self.function_rules = {}
+        self.path_functions = {}
+        # path items written by the builder, and path items documented on `app.openapi` directly
+        self.built_paths = {}
+        self.documented_paths = {}
+        self.schemas = {}
+        self.pruned = []
+
+    def is_stale(self, app):
+        """Tells whether specs, routes, view functions or schemas changed since the last build
+
+        Every check runs in constant time, so requests served from an up to date spec do not
+        scale with the number of routes.
+
+        Args:
+            app (flask.Flask): flask app instance
+
+        Returns:
+            bool: True if `build` has anything to patch in
+        """
+        return (
+            not self.built
+            or len(plugins.SPEC_LOG) != self.spec_revision
+            or len(app.url_map._rules) != self.rule_count
+            or self.schema_factory.revision != self.schema_revision
+            or self.views_changed(app)
+        )
+
+    def views_changed(self, app):
+        view_functions = app.view_functions
+        return view_functions is not self.view_functions or (
+            view_functions.revision != self.view_revision
+        )
+
+    def build(self, app):
+        """Patches the api docs of an app with everything that changed since the last build
+
+        Args:
+            app (flask.Flask): flask app instance
+
+        Returns:
+            bool: True if the api docs changed
+        """
+        api = app.openapi  # type: swagger.OpenApi
+        dirty, self.spec_revision = plugins.get_changes(self.spec_revision)
+        dirty = dict.fromkeys(dirty)
+
+        with stats.measure(stats.RULE_LOOKUP):
+            # functions routed since the last build
+            rules = app.url_map._rules
+            for rule in rules[self.rule_count :]:
+                fn = app.view_functions.get(rule.endpoint)
+                if fn in plugins.API_SPECS:
+                    dirty[fn] = None
+            self.rule_count = len(rules)
+
+            # functions whose endpoint now routes another view function
+            index = get_rule_index(app)
+            index.refresh(app)
+            stale = self.update_view_functions(app)
+            dirty_paths = {}
+            for fn, rule in list(self.function_rules.items()):
+                if rule.endpoint not in stale or index.get_rule(fn, app, refresh=False) is rule:
+                    continue
+                del self.function_rules[fn]
+                path = plugins.parse_flask_rule(rule.rule)
+                self.path_functions[path].remove(fn)
+                dirty_paths[path] = None
+                dirty[fn] = None
+            for endpoint in stale:
+                if app.view_functions.get(endpoint) in plugins.API_SPECS:
+                    dirty[app.view_functions[endpoint]] = None
+
+            for fn in dirty:
+                rule = index.get_rule(fn, app, refresh=False)
+                if not rule:
+                    continue
+                path = plugins.parse_flask_rule(rule.rule)
+                functions = self.path_functions.setdefault(path, [])
+                if fn not in functions:
+                    functions.append(fn)
+                self.function_rules[fn] = rule
+                dirty_paths[path] = None
+
+        with stats.measure(stats.PARSE_SPECS):
+            for path in dirty_paths:
+                self.update_path(api, path)
+
+        schemas_changed = self.update_schemas(api)
+        changed = bool(dirty_paths) or schemas_changed
+        self.built = True
+        if changed and self.prune_components:
+            with stats.measure(stats.COMPONENT_ASSEMBLY):
+                self.prune_schemas(api)
+        return changed
+
+    def update_view_functions(self, app):
+        """Records the view functions of an app, only walked when their revision changed
+
+        Args:
+            app (flask.Flask): flask app instance
+
+        Returns:
+            set[str]: endpoints whose view function was replaced or removed since the last build
+        """
+        if not self.views_changed(app):
+            return set()
+        view_functions = track_view_functions(app)
+        previous = self.view_snapshot
+        stale = {e for e, fn in previous.items() if view_functions.get(e) is not fn}
+        self.view_functions = view_functions
+        self.view_revision = view_functions.revision
+        self.view_snapshot = dict(view_functions)
+        return stale
+
+    def update_path(self, api, path):
+        """Writes the path item built from the functions routed to a path into the api docs
+
+        Path items documented on `app.openapi` directly are kept, the operations of the routed
+        functions are merged into a copy of them.
+
+        Args:
+            api (swagger.OpenApi): api docs built by this builder
+            path (str): openapi path, eg `/pets/{id}`
+        """
+        items = api.paths.items
+        current = items.get(path)
+        if current is not None and current is not self.built_paths.get(path):
+            self.documented_paths[path] = current
+        documented = self.documented_paths.get(path)
+
+        if not self.path_functions.get(path):
+            self.path_functions.pop(path, None)
+            self.built_paths.pop(path, None)
+            if documented is None:
+                items.pop(path, None)
+            else:
+                items[path] = documented
+            return
+
+        path_item = self.build_path_item(api, path)
+        if documented is not None:
+            merged = attr.evolve(
+                documented,
+                servers=list(documented.servers or ()) or None,
+                parameters=list(documented.parameters or ()) or None,
+            )
+            merged.merge_path_item(path_item)
+            path_item = merged
+        items[path] = self.built_paths[path] = path_item
+
+    def build_path_item(self, api, path, functions=None):
+        path_item = None
+        for fn in functions or self.path_functions[path]:
+            pi = parse_specs(self.function_rules[fn], plugins.API_SPECS[fn], api)
+            pi.description = inspect.getdoc(fn)
+            if path_item is None:
+                path_item = pi
+            else:
+                path_item.merge_path_item(pi)
+        return path_item
+
+    def build_blueprint_paths(self, api, blueprint):
+        """Builds the path items of the functions routed by a blueprint, nested blueprints included
+
+        Args:
+            api (swagger.OpenApi): api docs built by this builder
+            blueprint (str): blueprint name
+
+        Returns:
+            dict[str, swagger.PathItem]: path items restricted to the functions of `blueprint`
+        """
+        prefix = blueprint + "."
+        paths = {}
+        for path, functions in self.path_functions.items():
+            routed = [
+                fn for fn in functions if self.function_rules[fn].endpoint.startswith(prefix)
+            ]
+            if routed:
+                paths[path] = self.build_path_item(api, path, routed)
+        return paths
+
+    def blueprint_names(self):
+        """Returns the names of the blueprints routing documented functions, nested ones included
+
+        Returns:
+            list[str]: blueprint names, eg `pets` and `pets.admin`, in routing order
+        """
+        names = []
+        for rule in self.function_rules.values():
+            parts = rule.endpoint.split(".")[:-1]
+            names.extend(".".join(parts[: i + 1]) for i in range(len(parts)))
+        return list(dict.fromkeys(names))
+
+    def update_schemas(self, api):
+        factory = self.schema_factory
+        if factory.revision == self.schema_revision:
+            return False
+        if factory.revision < self.schema_revision:
+            # registry was cleared, start over
+            api.components.schemas = None
+            self.schemas = {}
+            self.schema_revision = 0
+        with stats.measure(stats.SCHEMA_REGISTRATION):
+            changed = factory.changed_since(self.schema_revision)
+            self.schemas.update(changed)
+        with stats.measure(stats.COMPONENT_ASSEMBLY):
+            api.components.add_component(swagger.ComponentType.SCHEMA, changed)
+        self.schema_revision = factory.revision
+        return True
+
+    def prune_schemas(self, api):
+        """Keeps the registered schemas reachable from the paths and other components of the docs
+
+        References are followed through `$ref`, so `items`, `properties` and composite schemas
+        are all covered.
+
+        Args:
+            api (swagger.OpenApi): api docs built by this builder
+        """
+        components = api.components
+        roots = [api.paths.to_dict(), attr.evolve(components, schemas=None).to_dict()]
+        reachable = slices.reachable_schemas(roots, self.schemas)
+        self.pruned = [name for name in self.schemas if name not in reachable]
+        components.schemas = reachable or None
 
 
-@functools.lru_cache(maxsize=10)
 def get_api_docs(app):
     """Traverses all flask mappings and retrieves all specified paths and parsing the specs
 
+    The first call builds the complete api docs, later calls only patch in functions, routes and
+    schemas registered in the meantime. Encoded documents are dropped whenever the docs change.
+
+    Args:
+        app (flask.Flask): flask app instance
+
+    Returns:
+        bool: True if the api docs changed since the previous call
+    """
+
+    state = documents.get_state(app)
+    if state.get("prebuilt"):
+        # served from encoded documents, there is no spec to build
+        return False
+    with state["lock"]:
+        factory = state.get("schema_factory", swagger.schema_factory)
+        if "builder" not in state:
+            state["builder"] = SpecBuilder(factory, state.get("prune_components", False))
+        builder = state["builder"]
+        changed = False
+        if builder.is_stale(app):
+            # only builds are recorded, requests served from the built spec are not
+            with factory.activate(), stats.record("build", state.get("stats_listeners")):
+                changed = builder.build(app)
+        if changed:
+            documents.clear_documents(app)
+        if "warm_up" not in state:
+            state["ready"].set()
+    return changed
+
+
+def get_pruned_schemas(app):
+    """Reports the schemas left out of the api docs of an app by `prune_components`
+
+    Args:
+        app (flask.Flask): flask app instance, registered with `register_openapi`
+
+    Returns:
+        list[str]: names of the registered schemas no path references, in registration order
+    """
+    get_api_docs(app)
+    builder = documents.get_state(app).get("builder")
+    return list(builder.pruned) if builder else []
+
+
+def get_document_key(name, profile=None):
+    """Returns the cache key of a document, eg `machine.json`, also its exported file extension"""
+
+    return "{}.{}".format(profile, name) if profile else name
+
+
+def get_slice_key(name, profile=None, tag=None, blueprint=None):
+    """Returns the cache key of a slice, eg `machine.json?tag=pet`"""
+
+    key = get_document_key(name, profile)
+    return "{}?tag={}".format(key, tag) if tag else "{}?blueprint={}".format(key, blueprint)
+
+
+def get_spec_document(app, name, profile=None):
+    """Returns the encoded api docs of an app, encoding it on first use after each build
+
+    Args:
+        app (flask.Flask): flask app instance
+        name (str): document format, one of `json` or `yaml`
+        profile (str): document profile, one of `profiles.PROFILES`, the complete docs if None
+
+    Returns:
+        documents.EncodedDocument: encoded document, None if a prebuilt app lacks the profile
+    """
+
+    state = documents.get_state(app)
+    key = get_document_key(name, profile)
+    if state.get("prebuilt"):
+        return state["documents"].get(key)
+
+    get_api_docs(app)
+    encoder = functools.partial(encode_document, app, name, key=key, profile=profile)
+    return documents.get_document(app, key, encoder)
+
+
+def get_spec_documents(app):
+    """Returns every encoded document of an app, profiles included, keyed by document key
+
+    The slices of every tag and blueprint the spec documents are included as well, eg under
+    `json?tag=pet`, so prebuilt apps serve them too.
+    """
+    variants = [
+        (name, profile)
+        for profile in (None,) + tuple(profiles.PROFILES)
+        for name in documents.ENCODERS
+    ]
+    state = documents.get_state(app)
+    if state.get("prebuilt"):
+        return dict(state["documents"])
+
+    with app.app_context():
+        encoded = {
+            get_document_key(name, profile): get_spec_document(app, name, profile)
+            for name, profile in variants
+        }
+        tags = slices.tag_names(app.openapi)
+        blueprints = state["builder"].blueprint_names()
+        for name, profile in variants:
+            for tag in tags:
+                document = get_spec_slice(app, name, tag=tag, profile=profile)
+                if document is not None:
+                    encoded[get_slice_key(name, profile, tag=tag)] = document
+            for blueprint in blueprints:
+                document = get_spec_slice(app, name, blueprint=blueprint, profile=profile)
+                if document is not None:
+                    encoded[get_slice_key(name, profile, blueprint=blueprint)] = document
+        return encoded
+
+
+def encode_document(app, name, api=None, key=None, profile=None):
+    """Encodes the api docs of an app, or a slice of them, recording the encoding phases
+
+    The profile transform runs before the transforms set up by `register_openapi`.
+    """
+    state = documents.get_state(app)
+    transforms = [profiles.PROFILES[profile]] if profile else []
+    transforms.extend(state.get("transforms", ()))
+    with stats.record(key or name, state.get("stats_listeners")):
+        return documents.ENCODERS[name](api or app.openapi, transforms)
+
+
+def get_spec_slice(app, name, tag=None, blueprint=None, profile=None):
+    """Returns the encoded slice of the api docs of an app covering a tag or a blueprint
+
+    Slices only hold the component schemas they reference and are cached until the api docs
+    change, each with its own ETag.
+
+    Args:
+        app (flask.Flask): flask app instance
+        name (str): document format, one of `json` or `yaml`
+        tag (str): tag of the operations to keep
+        blueprint (str): name of the blueprint routing the operations to keep, used without `tag`
+        profile (str): document profile, one of `profiles.PROFILES`, the complete slice if None
+
+    Returns:
+        documents.EncodedDocument: encoded slice, None if it has no paths
+    """
+    state = documents.get_state(app)
+    key = get_slice_key(name, profile, tag=tag, blueprint=blueprint)
+    if state.get("prebuilt"):
+        # prebuilt documents hold the slices of every tag and blueprint the spec documents
+        return state["documents"].get(key)
+
+    get_api_docs(app)
+    document = state["documents"].get(key)
+    if document is not None:
+        return document
+    with state["lock"]:
+        document = state["documents"].get(key)
+        if document is None:
+            if tag:
+                paths = slices.tag_paths(app.openapi, tag)
+            else:
+                factory = state.get("schema_factory", swagger.schema_factory)
+                with factory.activate():
+                    paths = state["builder"].build_blueprint_paths(app.openapi, blueprint)
+            api = slices.make_slice(app.openapi, paths)
+            if api is None:
+                return None
+            document = encode_document(app, name, api, key, profile)
+            state["documents"][key] = document
+    return document
+
+
+def freeze(app):
+    """Builds and encodes the api docs of an app for good, meant to run before forking workers
+
+    Every document format and profile is encoded to immutable bytes and served as prebuilt from
+    then on. The spec object tree and its builder are dropped along with the specs registered on
+    the app's view functions, the app's own schema factory is frozen and emptied, the process wide
+    `swagger.schema_factory` is left as is. The remaining objects are moved to the permanent
+    generation with `gc.freeze`, so forked workers keep sharing the memory pages holding them
+    instead of copying them on garbage collection.
+
+    Freezing is meant as the last step of loading an app, view functions it shares with apps
+    created afterwards are not documented by them anymore.
+
+    Example:
+        .. code-block::
+
+            # app module loaded once in the master by `gunicorn --preload`
+            app = create_app()
+            flaskdoc.freeze(app)
+
+    Args:
+        app (flask.Flask): flask app instance, registered with `register_openapi`
+
+    Returns:
+        dict[str, documents.EncodedDocument]: encoded documents keyed by document key, eg
+            `machine.json`
+    """
+    state = documents.get_state(app)
+    encoded = get_spec_documents(app)
+    if isinstance(app, Flask) and app._doc is not None:
+        with app.app_context():
+            for name in documents.ENCODERS:
+                app.encode_spec_document(name)
+    with state["lock"]:
+        state["documents"].update(encoded)
+        state["prebuilt"] = True
+        state.pop("builder", None)
+        app.openapi = None
+        if isinstance(app, Flask):
+            app._doc = app._paths = None
+        for fn in set(app.view_functions.values()):
+            plugins.API_SPECS.pop(fn, None)
+        factory = state.get("schema_factory")
+        if factory is not None and factory is not swagger.schema_factory:
+            factory.freeze(release=True)
+    state["ready"].set()
+
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    return encoded
+
+
+def export_documents(app, directory):
+    """Builds the api docs of an app and writes every encoded document to a directory
+
+    The written directory can be passed as `prebuilt` to `register_openapi`.
+
+    Args:
+        app (flask.Flask): flask app instance, registered with `register_openapi`
+        directory (str): output directory
+
+    Returns:
+        list[str]: paths of the written files
+    """
+    return documents.write_documents(get_spec_documents(app), directory)
+
+
+class ViewFunctions(dict):
+    """View functions of an app counting their changes, so staleness checks run in constant time
+
+    Flask adds, and callers replace, view functions through item assignment, every change bumps
+    `revision`.
+    """
+
+    revision = 0
+
+    def __setitem__(self, key, value):
+        self.revision += 1
+        super(ViewFunctions, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.revision += 1
+        super(ViewFunctions, self).__delitem__(key)
+
+    def pop(self, *args):
+        self.revision += 1
+        return super(ViewFunctions, self).pop(*args)
+
+    def popitem(self):
+        self.revision += 1
+        return super(ViewFunctions, self).popitem()
+
+    def setdefault(self, key, default=None):
+        self.revision += 1
+        return super(ViewFunctions, self).setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.revision += 1
+        super(ViewFunctions, self).update(*args, **kwargs)
+
+    def clear(self):
+        self.revision += 1
+        super(ViewFunctions, self).clear()
+
+
+def track_view_functions(app):
+    """Swaps the view functions of an app for a `ViewFunctions` dict, once
+
     Args:
         app (flask.Flask): flask app instance
 
     Returns:
-        int: #fixme doesn't seem like a useful return value
+        ViewFunctions: view functions of the app
     """
+    if not isinstance(app.view_functions, ViewFunctions):
+        app.view_functions = ViewFunctions(app.view_functions)
+    return app.view_functions
+
+
+class RuleIndex(object):
+    """Reverse index from view functions to their endpoints and url rules
+
+    The index is refreshed whenever view functions are added to the app, replaced or removed, as
+    told by the revision of the app's `ViewFunctions`, while rules are looked up through the
+    endpoint index werkzeug keeps on the url map, so lookups run in constant time.
+    """
+
+    def __init__(self):
+        self._view_functions = None
+        self._revision = None
+        self._view_endpoints = {}
+
+    def refresh(self, app):
+        """Re-indexes the view functions of an app if they changed since the last refresh
+
+        Args:
+            app (flask.Flask): flask app instance
+        """
+        if not self.is_stale(app):
+            return
+        view_functions = track_view_functions(app)
+        view_endpoints = {}
+        for endpoint, func in view_functions.items():
+            view_endpoints.setdefault(func, []).append(endpoint)
+        self._view_endpoints = view_endpoints
+        self._view_functions = view_functions
+        self._revision = view_functions.revision
+
+    def is_stale(self, app):
+        """Tells whether the view functions of an app changed since the last refresh, in O(1)"""
+
+        view_functions = app.view_functions
+        return view_functions is not self._view_functions or (
+            view_functions.revision != self._revision
+        )
+
+    def get_rule(self, fn, app, refresh=True):
+        """Returns the first url rule registered for a view function
+
+        Args:
+            fn (callable): view function
+            app (flask.Flask): flask app instance
+            refresh (bool): refreshes the index first if the view functions changed, callers
+                looking up many functions refresh once themselves
+
+        Returns:
+            werkzeug.routing.Rule: url rule, None if the function is not routed
+        """
+        if refresh:
+            self.refresh(app)
+        rules_by_endpoint = app.url_map._rules_by_endpoint
+        for endpoint in self._view_endpoints.get(fn, ()):
+            rules = rules_by_endpoint.get(endpoint)
+            if rules:
+                return rules[0]
+        return None
+
 
-    api = app.openapi  # type: swagger.OpenApi
-    for fn, spec in plugins.get_docs():
-        docs = inspect.getdoc(fn)
-        rule = get_api_rule(fn, app)
-        if rule:
-            pi = parse_specs(rule, spec, api)
-            pi.description = docs
-            api.paths.add(plugins.parse_flask_rule(rule.rule), pi)
-    api.components.add_component(swagger.ComponentType.SCHEMA, swagger.schema_factory.schemas)
-    return 1
+def get_rule_index(app):
+    state = documents.get_state(app)
+    if "rules" not in state:
+        state["rules"] = RuleIndex()
+    return state["rules"]
 
 
 def get_api_rule(fn, app):
-    for endpoint, func in app.view_functions.items():
-        if func == fn:
-            for rule in app.url_map._rules:
-                if rule.endpoint == endpoint:
-                    return rule
-    return None
+    return get_rule_index(app).get_rule(fn, app)
 
 
 def parse_specs(rule, spec, api):
@@ -214,9 +1077,6 @@ def parse_specs(rule, spec, api):
     """
 
     pi = swagger.PathItem()
-    # for arg in rule.arguments:
-    #     par = swagger.PathParameter(name=arg)
-    #     pi.add_parameter(par)
 
     # TODO: review extracting from flask
     # for op in rule.methods:
@@ -230,6 +1090,84 @@ def parse_specs(rule, spec, api):
             pi.add_parameter(model)
         elif isinstance(model, swagger.Operation):
             pi.add_operation(model)
-        elif isinstance(model, swagger.Tag):
+        elif isinstance(model, swagger.Tag) and model not in api.tags:
+            # paths are parsed again by incremental builds, their tags are only added once
             api.add_tag(model)
+
+    # rule variables not documented by hand are typed from their converters
+    declared = get_declared_path_parameters(pi)
+    for name, schema in get_path_parameters(rule):
+        if name not in declared:
+            pi.add_parameter(swagger.PathParameter(name=name, schema=schema))
     return pi
+
+
+def get_declared_path_parameters(path_item):
+    """Returns the names of path parameters declared on a path item, or on all its operations"""
+
+    def path_parameters(parameters):
+        return {
+            p.name
+            for p in parameters or []
+            if isinstance(p, swagger.Parameter) and p._in == swagger.ParameterLocation.PATH
+        }
+
+    declared = path_parameters(path_item.parameters)
+    operations = [
+        getattr(path_item, method.value.lower())
+        for method in swagger.HttpMethod
+        if getattr(path_item, method.value.lower())
+    ]
+    if operations:
+        declared.update(set.intersection(*[path_parameters(op.parameters) for op in operations]))
+    return declared
+
+
+def get_path_parameters(rule):
+    """Returns the path parameters of a url rule along with schemas typed from their converters
+
+    Results are memoized per rule string and converter types.
+
+    Args:
+        rule (werkzeug.routing.Rule): bound url rule
+
+    Returns:
+        tuple[tuple[str, swagger.Schema]]: `(name, schema)` pairs in order of appearance
+    """
+    converters = getattr(rule, "_converters", None) or {}
+    key = (rule.rule, tuple((name, type(c)) for name, c in converters.items()))
+    parameters = PATH_PARAMETERS.get(key)
+    if parameters is None:
+        parameters = PATH_PARAMETERS[key] = tuple(
+            (name, converter_schema(converters.get(name)))
+            for name in plugins.get_rule_variables(rule.rule)
+        )
+    return parameters
+
+
+def converter_schema(converter):
+    """Creates the schema of values matched by a werkzeug converter
+
+    Integer and float converters carry their bounds, the any converter its allowed values, other
+    converters, custom ones included, match strings.
+
+    Args:
+        converter (werkzeug.routing.BaseConverter): converter instance, None for the default
+
+    Returns:
+        swagger.Schema: interned schema
+    """
+    schema = swagger.String()
+    if isinstance(converter, (routing.IntegerConverter, routing.FloatConverter)):
+        schema_class = (
+            swagger.Integer if isinstance(converter, routing.IntegerConverter) else swagger.Number
+        )
+        minimum = converter.min
+        if minimum is None and not getattr(converter, "signed", False):
+            minimum = 0
+        schema = schema_class(minimum=minimum, maximum=converter.max)
+    elif isinstance(converter, routing.UUIDConverter):
+        schema = swagger.String(format="uuid")
+    elif isinstance(converter, routing.AnyConverter) and getattr(converter, "items", None):
+        schema = swagger.String(enum=sorted(converter.items))
+    return intern_schema(schema)
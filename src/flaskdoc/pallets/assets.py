@@ -0,0 +1,143 @@
+""" Fingerprinted serving of the bundled swagger ui assets
+
+    Asset urls rendered into the ui templates carry a content hash, requests for the current
+    fingerprint are cached by browsers as immutable. Gzip and brotli sidecars written next to the
+    assets at package build time are served to clients accepting them.
+"""
+import functools
+import hashlib
+import mimetypes
+import os
+
+import flask
+
+try:
+    from werkzeug.security import safe_join
+except ImportError:  # pragma: no cover, older werkzeug
+    from flask import safe_join
+
+# one year, the longest max-age recommended by RFC 7234
+IMMUTABLE_MAX_AGE = 31536000
+
+# sidecar file suffixes keyed by content coding, in order of preference
+SIDECARS = {"br": ".br", "gzip": ".gz"}
+
+
+def hash_file(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(functools.partial(f.read, 65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+@functools.lru_cache(maxsize=16)
+def get_fingerprints(directory):
+    """Computes the content hashes of the assets of a directory, once per process
+
+    Only files present in the directory are hashed, request paths never reach the file system
+    before being matched against the result. Sidecars are left out, they are served in place of
+    their asset.
+
+    Args:
+        directory (str): assets directory
+
+    Returns:
+        dict[str, str]: short content hashes keyed by asset path relative to `directory`
+    """
+    sidecar_suffixes = tuple(SIDECARS.values())
+    fingerprints = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(sidecar_suffixes):
+                continue
+            file_path = os.path.join(root, name)
+            filename = os.path.relpath(file_path, directory).replace(os.sep, "/")
+            fingerprints[filename] = hash_file(file_path)
+    return fingerprints
+
+
+def fingerprint(directory, filename):
+    """Returns the content hash of an asset
+
+    Args:
+        directory (str): assets directory
+        filename (str): asset path relative to `directory`
+
+    Returns:
+        str|None: short content hash, None if the asset is not one of the assets of `directory`
+    """
+    return get_fingerprints(directory).get(filename)
+
+
+def asset_url(directory, filename):
+    """Returns the relative fingerprinted url of an asset
+
+    Args:
+        directory (str): assets directory
+        filename (str): asset path relative to `directory`
+
+    Returns:
+        str: url with the content hash as `v` query parameter, eg `./swagger-ui.css?v=0a1b2c3d4e5f`
+    """
+    version = fingerprint(directory, filename)
+    if version is None:
+        return "./{}".format(filename)
+    return "./{}?v={}".format(filename, version)
+
+
+def get_sidecar(directory, filename, accept_encodings):
+    """Picks the precompressed sidecar best matching the client `Accept-Encoding` header
+
+    Args:
+        directory (str): assets directory
+        filename (str): asset path relative to `directory`
+        accept_encodings (werkzeug.datastructures.Accept): parsed `Accept-Encoding` header
+
+    Returns:
+        tuple[str|None, str|None]: sidecar path relative to `directory` and its content coding
+    """
+    available = [
+        coding
+        for coding, suffix in SIDECARS.items()
+        if os.path.isfile(safe_join(directory, filename + suffix) or "")
+    ]
+    coding = accept_encodings.best_match(available)
+    if coding is None:
+        return None, None
+    return filename + SIDECARS[coding], coding
+
+
+def send_asset(directory, filename):
+    """Sends a static asset, preferring precompressed sidecars
+
+    Requests carrying the current fingerprint of the asset as `v` query parameter are marked
+    immutable with a long max-age. Files that are not assets of the directory are answered with
+    `404`.
+
+    Args:
+        directory (str): assets directory
+        filename (str): asset path relative to `directory`
+
+    Returns:
+        flask.Response: asset response
+    """
+    version = fingerprint(directory, filename)
+    if version is None:
+        flask.abort(404)
+
+    request = flask.request
+    sidecar, coding = get_sidecar(directory, filename, request.accept_encodings)
+    if sidecar is None:
+        response = flask.send_from_directory(directory, filename)
+    else:
+        mimetype = mimetypes.guess_type(filename)[0]
+        response = flask.send_from_directory(directory, sidecar, mimetype=mimetype)
+        response.content_encoding = coding
+    response.vary.add("Accept-Encoding")
+
+    if request.args.get("v") == version:
+        response.headers["Cache-Control"] = "public, max-age={}, immutable".format(
+            IMMUTABLE_MAX_AGE
+        )
+    return response
@@ -0,0 +1,442 @@
+""" Pre-encoded spec documents and the responses serving them
+
+    The OpenAPI document only changes when the spec is rebuilt, so each output format is encoded
+    to bytes once per build, along with its gzip and brotli compressed variants, and served from
+    those buffers with a strong ETag.
+"""
+import collections.abc
+import functools
+import gzip
+import json
+import mmap
+import os
+import threading
+import urllib.parse
+
+import attr
+import flask
+import yaml
+from werkzeug.http import generate_etag
+
+from flaskdoc.core import DictMixin
+from flaskdoc.pallets import stats
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # pragma: no cover, libyaml is not available
+    from yaml import SafeDumper
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXTENSION_NAME = "flaskdoc"
+MANIFEST = "manifest.json"
+# chunk size used when streaming memory mapped or streamed documents
+CHUNK_SIZE = 65536
+# values of these exact types are encoded directly
+ATOMIC_TYPES = frozenset([str, int, float, bool, type(None)])
+JSON_SEPARATORS = (",", ":")
+
+_encode_atomic = json.JSONEncoder(separators=JSON_SEPARATORS).encode
+
+
+class SpecDumper(SafeDumper):
+    """Safe YAML dumper for spec dictionaries, uses libyaml when available"""
+
+    def ignore_aliases(self, data):
+        # spec documents never use anchors
+        return True
+
+
+SpecDumper.add_representer(tuple, SpecDumper.represent_list)
+
+
+def compress(data):
+    """Compresses data with every supported content coding
+
+    Brotli is only used when the optional `brotli` package is installed.
+
+    Args:
+        data (bytes): raw data
+
+    Returns:
+        dict[str, bytes]: compressed data keyed by content coding, in order of preference
+    """
+    variants = {}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data)
+    variants["gzip"] = gzip.compress(data, compresslevel=9)
+    return variants
+
+
+@attr.s(frozen=True)
+class EncodedDocument(object):
+    """Immutable, encoded representation of a spec document
+
+    Properties:
+        data (bytes|mmap.mmap): encoded document
+        mimetype (str): content type the document is served as
+        etag (str): strong entity tag computed from `data`
+        compressed (dict[str, bytes|mmap.mmap]): precompressed variants of `data` keyed by
+            content coding
+    """
+
+    data = attr.ib(type=bytes)
+    mimetype = attr.ib(type=str)
+    etag = attr.ib(type=str)
+    compressed = attr.ib(factory=dict)
+
+    @classmethod
+    def from_bytes(cls, data, mimetype):
+        return cls(
+            data=data, mimetype=mimetype, etag=generate_etag(data), compressed=compress(data)
+        )
+
+    def negotiate(self, accept_encodings):
+        """Picks the variant best matching the client `Accept-Encoding` header
+
+        Args:
+            accept_encodings (werkzeug.datastructures.Accept): parsed `Accept-Encoding` header
+
+        Returns:
+            tuple[bytes, str|None]: variant data and its content coding, None if uncompressed
+        """
+        coding = accept_encodings.best_match(list(self.compressed))
+        if coding is None:
+            return self.data, None
+        return self.compressed[coding], coding
+
+
+def to_spec(api, transforms=()):
+    """Converts an api spec to a dictionary and applies transforms to it
+
+    Args:
+        api (flaskdoc.swagger.OpenApi): api spec
+        transforms (list[callable]): functions called in turn with the spec dictionary, each
+            returning the dictionary passed on
+
+    Returns:
+        dict: spec dictionary
+    """
+    with stats.measure(stats.SERIALIZATION):
+        spec = api.to_dict()
+    for transform in transforms:
+        spec = transform(spec)
+    return spec
+
+
+def encode_json(api, transforms=()):
+    """Encodes an api spec as JSON
+
+    Args:
+        api (flaskdoc.swagger.OpenApi): api spec
+        transforms (list[callable]): spec dictionary transforms, see `to_spec`
+
+    Returns:
+        EncodedDocument: encoded JSON document
+    """
+    spec = to_spec(api, transforms)
+    with stats.measure(stats.ENCODING):
+        data = flask.json.dumps(spec, separators=(",", ":")).encode("utf-8")
+        return EncodedDocument.from_bytes(data, "application/json")
+
+
+def encode_yaml(api, transforms=()):
+    """Encodes an api spec as YAML, straight from the spec dictionary
+
+    Args:
+        api (flaskdoc.swagger.OpenApi): api spec
+        transforms (list[callable]): spec dictionary transforms, see `to_spec`
+
+    Returns:
+        EncodedDocument: encoded YAML document
+    """
+    spec = to_spec(api, transforms)
+    with stats.measure(stats.ENCODING):
+        data = yaml.dump(spec, Dumper=SpecDumper, encoding="utf-8")
+        return EncodedDocument.from_bytes(data, "application/yaml")
+
+
+ENCODERS = {"json": encode_json, "yaml": encode_yaml}
+
+
+def get_state(app):
+    """Returns the flaskdoc state of an app, stored under `app.extensions`
+
+    Args:
+        app (flask.Flask): flask app instance
+
+    Returns:
+        dict: flaskdoc state, holds the encoded `documents`, the build `lock` and the `ready` event
+            amongst others
+    """
+    state = app.extensions.get(EXTENSION_NAME)
+    if state is None:
+        state = app.extensions.setdefault(
+            EXTENSION_NAME,
+            {"documents": {}, "lock": threading.RLock(), "ready": threading.Event()},
+        )
+    return state
+
+
+def get_document(app, name, encoder):
+    """Returns a cached encoded document, encoding it on first use
+
+    Encoding is serialized by the state lock, concurrent first requests encode the document once.
+
+    Args:
+        app (flask.Flask): flask app instance
+        name (str): document cache key, eg `json`
+        encoder (callable): function with no arguments returning an `EncodedDocument`
+
+    Returns:
+        EncodedDocument: encoded document
+    """
+    state = get_state(app)
+    document = state["documents"].get(name)
+    if document is None:
+        with state["lock"]:
+            document = state["documents"].get(name)
+            if document is None:
+                document = state["documents"][name] = encoder()
+    return document
+
+
+def clear_documents(app):
+    """Drops all encoded documents of an app, called whenever the spec is rebuilt
+
+    Prebuilt documents are kept, they cannot be encoded again.
+    """
+    state = get_state(app)
+    if not state.get("prebuilt"):
+        state["documents"].clear()
+
+
+def write_documents(encoded_documents, directory):
+    """Writes encoded documents and their compressed variants to a directory
+
+    A `manifest.json` describing the written files is added, for `load_documents`.
+
+    Args:
+        encoded_documents (dict[str, EncodedDocument]): documents keyed by document key, eg `json`
+            or `json?tag=pet`
+        directory (str): output directory, created if missing
+
+    Returns:
+        list[str]: paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    written = []
+
+    def write(filename, data):
+        file_path = os.path.join(directory, filename)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        written.append(file_path)
+
+    for name, document in encoded_documents.items():
+        # slice keys, eg `json?tag=pet`, are quoted into plain file names
+        filename = "openapi.{}".format(urllib.parse.quote(name, safe="."))
+        write(filename, document.data)
+        compressed = {}
+        for coding, data in document.compressed.items():
+            compressed[coding] = "{}.{}".format(filename, "gz" if coding == "gzip" else coding)
+            write(compressed[coding], data)
+        manifest[name] = dict(
+            filename=filename,
+            mimetype=document.mimetype,
+            etag=document.etag,
+            compressed=compressed,
+        )
+    write(MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+    return written
+
+
+def map_file(file_path):
+    """Memory maps a file for reading
+
+    Args:
+        file_path (str): path to the file
+
+    Returns:
+        mmap.mmap|bytes: read only mapping, plain bytes for empty files which cannot be mapped
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_documents(directory):
+    """Loads documents written by `write_documents` as memory mapped buffers
+
+    Args:
+        directory (str): directory holding the exported documents
+
+    Returns:
+        dict[str, EncodedDocument]: documents keyed by format
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    loaded = {}
+    for name, entry in manifest.items():
+        compressed = {
+            coding: map_file(os.path.join(directory, filename))
+            for coding, filename in entry["compressed"].items()
+        }
+        loaded[name] = EncodedDocument(
+            data=map_file(os.path.join(directory, entry["filename"])),
+            mimetype=entry["mimetype"],
+            etag=entry["etag"],
+            compressed=compressed,
+        )
+    return loaded
+
+
+def iter_buffer(buffer, chunk_size=CHUNK_SIZE):
+    """Yields a buffer as bytes chunks"""
+
+    for offset in range(0, len(buffer), chunk_size):
+        yield buffer[offset : offset + chunk_size]
+
+
+@functools.lru_cache(maxsize=None)
+def streams_items(cls):
+    """Checks if a model class can be streamed item by item
+
+    Classes overriding `to_dict` without providing a matching `iter_items` are encoded whole.
+    """
+    for klass in cls.__mro__:
+        if "iter_items" in klass.__dict__:
+            return True
+        if "to_dict" in klass.__dict__:
+            return False
+    return False
+
+
+def iter_json(value, owner):
+    """Yields the JSON encoding of a spec value in small string parts
+
+    Mirrors `DictMixin._to_dict` while walking the tree depth first, so only the current branch
+    of the tree is held in memory.
+
+    Args:
+        value (object): value to encode
+        owner (flaskdoc.core.DictMixin): closest model holding the value
+
+    Yields:
+        str: JSON parts
+    """
+    if type(value) in ATOMIC_TYPES:
+        yield _encode_atomic(value)
+    elif isinstance(value, DictMixin):
+        if streams_items(type(value)):
+            for part in iter_json_object(value.iter_items(), value):
+                yield part
+        else:
+            yield flask.json.dumps(value.to_dict(), separators=JSON_SEPARATORS)
+    elif isinstance(value, list):
+        yield "["
+        for index, item in enumerate(value):
+            if index:
+                yield ","
+            for part in iter_json(item, owner):
+                yield part
+        yield "]"
+    elif isinstance(value, collections.abc.Mapping):
+        for part in iter_json_object(owner.iter_parse(value), owner):
+            yield part
+    elif hasattr(value, "__dict__"):
+        for part in iter_json_object(owner.iter_parse(value.__dict__), owner):
+            yield part
+    else:
+        yield flask.json.dumps(value, separators=JSON_SEPARATORS)
+
+
+def iter_json_object(items, owner):
+    yield "{"
+    first = True
+    for key, value in items:
+        if not isinstance(key, str):
+            key = _encode_atomic(key)
+        yield _encode_atomic(key) + ":" if first else "," + _encode_atomic(key) + ":"
+        first = False
+        for part in iter_json(value, owner):
+            yield part
+    yield "}"
+
+
+def stream_json(api, chunk_size=CHUNK_SIZE):
+    """Encodes an api spec as JSON while walking the spec tree
+
+    Peak memory grows with the depth of the tree rather than the size of the document, and the
+    first chunk is available right away. Object keys are emitted in model order.
+
+    Args:
+        api (flaskdoc.swagger.OpenApi): api spec
+        chunk_size (int): approximate size of the yielded chunks
+
+    Yields:
+        bytes: JSON chunks
+    """
+    parts = []
+    size = 0
+    for part in iter_json(api, api):
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+            size = 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+def stream_document(api):
+    """Creates a streamed JSON response for an api spec, encoded while it is sent"""
+
+    return flask.Response(
+        flask.stream_with_context(stream_json(api)), mimetype="application/json"
+    )
+
+
+def send_document(document, max_age=None):
+    """Creates a response for an encoded document
+
+    The precompressed variant matching the request `Accept-Encoding` header is sent when available.
+    Responds with `304 Not Modified` if the request `If-None-Match` header matches the ETag of the
+    variant.
+
+    Args:
+        document (EncodedDocument): document to send
+        max_age (int): seconds clients may cache the document for, revalidate on every use if None
+
+    Returns:
+        flask.Response: document response
+    """
+    data, coding = document.negotiate(flask.request.accept_encodings)
+    if isinstance(data, bytes):
+        response = flask.Response(data, mimetype=document.mimetype)
+    else:
+        # memory mapped, stream it without copying the whole document
+        response = flask.Response(
+            iter_buffer(data), mimetype=document.mimetype, direct_passthrough=True
+        )
+        response.content_length = len(data)
+    response.vary.add("Accept-Encoding")
+    if coding is None:
+        response.set_etag(document.etag)
+    else:
+        response.content_encoding = coding
+        # representations must not share a strong etag
+        response.set_etag("{}-{}".format(document.etag, coding))
+    response.cache_control.public = True
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = max_age
+    return response.make_conditional(flask.request)
@@ -0,0 +1,222 @@
+""" Extraction of repeated inline parameters, responses and schemas into components
+
+    Works on the dictionary form of a spec, right before it is encoded. Structurally identical
+    subtrees whose encoding reaches a size threshold, and that are repeated or match an existing
+    component, are moved to `components` and every copy is replaced by a reference.
+"""
+import collections
+import json
+import re
+
+from flaskdoc.pallets import stats
+from flaskdoc.pallets.slices import HTTP_METHODS
+
+# schema keywords holding a single schema, a list of schemas and a mapping of schemas
+SCHEMA_KEYWORDS = ("items", "not", "additionalProperties")
+SCHEMA_LIST_KEYWORDS = ("allOf", "oneOf", "anyOf")
+SCHEMA_MAP_KEYWORDS = ("properties",)
+# keys holding free form values outside of schemas, never walked
+OPAQUE_KEYS = frozenset(["example", "examples"])
+INVALID_NAME_CHARACTERS = re.compile(r"[^a-zA-Z0-9.\-_]")
+
+
+def canonical_key(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def iter_operations(spec):
+    for path_item in (spec.get("paths") or {}).values():
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if isinstance(operation, dict):
+                yield operation
+
+
+def iter_parameter_slots(spec):
+    """Yields the `(container, key)` slots of the inline parameters of paths and operations"""
+
+    for path_item in (spec.get("paths") or {}).values():
+        for owner in [path_item] + [path_item[m] for m in HTTP_METHODS if path_item.get(m)]:
+            parameters = owner.get("parameters") or ()
+            for index in range(len(parameters)):
+                yield parameters, index
+
+
+def iter_response_slots(spec):
+    """Yields the `(container, key)` slots of the inline responses of operations"""
+
+    for operation in iter_operations(spec):
+        responses = operation.get("responses") or {}
+        for code in responses:
+            yield responses, code
+
+
+def walk_schema_slots(spec, visit):
+    """Walks the slots of every inline schema of a spec, parents before their children
+
+    Component schemas are walked as well but are no slots themselves.
+
+    Args:
+        spec (dict): spec dictionary
+        visit (callable): called with `(container, key)` for each slot, the schema in the slot
+            is not walked if it returns False
+    """
+    stack = [(spec, False)]
+    while stack:
+        node, is_schema = stack.pop()
+        if is_schema:
+            if "$ref" in node:
+                continue
+            slots = [(node, k) for k in SCHEMA_KEYWORDS if isinstance(node.get(k), dict)]
+            for keyword in SCHEMA_LIST_KEYWORDS:
+                schemas = node.get(keyword) or ()
+                slots.extend((schemas, i) for i in range(len(schemas)))
+            for keyword in SCHEMA_MAP_KEYWORDS:
+                schemas = node.get(keyword) or {}
+                slots.extend((schemas, name) for name in schemas)
+        else:
+            slots = []
+            for key, value in node.items():
+                if key in OPAQUE_KEYS or key.startswith("x-"):
+                    continue
+                if key == "schema" and isinstance(value, dict):
+                    slots.append((node, key))
+                elif key == "schemas" and node is spec.get("components"):
+                    stack.extend((schema, True) for schema in value.values())
+                elif isinstance(value, dict):
+                    stack.append((value, False))
+                elif isinstance(value, list):
+                    stack.extend((item, False) for item in value if isinstance(item, dict))
+        for container, key in reversed(slots):
+            if visit(container, key) is not False:
+                stack.append((container[key], True))
+
+
+class Extractor(object):
+    """Moves the qualifying subtrees of one component type to the components of a spec
+
+    Args:
+        spec (dict): spec dictionary, updated in place
+        component_type (str): key of the component type in `components`, eg `parameters`
+        threshold (int): minimum size in bytes of the compact JSON encoding of extracted subtrees
+        name (callable): function called with a `(container, key)` slot returning the preferred
+            component name of the subtree in the slot
+    """
+
+    def __init__(self, spec, component_type, threshold, name):
+        self.spec = spec
+        self.component_type = component_type
+        self.threshold = threshold
+        self.name = name
+        self.ref_base = "#/components/{}/".format(component_type)
+        components = spec.get("components") or {}
+        self.components = components.get(component_type) or {}
+        self.names = {}
+        for component_name, component in self.components.items():
+            if "$ref" not in component:
+                self.names.setdefault(canonical_key(component), component_name)
+        self.counts = collections.Counter()
+        self.extracted = {}
+
+    def count(self, container, key):
+        node = container[key]
+        if isinstance(node, dict) and "$ref" not in node:
+            self.counts[canonical_key(node)] += 1
+
+    def qualifies(self, key):
+        if len(key) < self.threshold:
+            return False
+        return self.counts[key] > 1 or key in self.names
+
+    def replace(self, container, key):
+        """Replaces the subtree in a slot by a reference if it qualifies
+
+        Returns:
+            bool: False if the subtree was replaced
+        """
+        node = container[key]
+        if not isinstance(node, dict) or "$ref" in node:
+            return True
+        node_key = canonical_key(node)
+        if not self.qualifies(node_key):
+            return True
+        name = self.names.get(node_key)
+        if name is None:
+            name = self.names[node_key] = self.unique_name(self.name(container, key))
+            self.extracted[name] = node
+        container[key] = {"$ref": self.ref_base + name}
+        return False
+
+    def unique_name(self, name):
+        name = INVALID_NAME_CHARACTERS.sub("_", name) or self.component_type
+        candidate, suffix = name, 1
+        while candidate in self.components or candidate in self.extracted:
+            suffix += 1
+            candidate = "{}{}".format(name, suffix)
+        return candidate
+
+    def commit(self):
+        """Adds the extracted subtrees to the components of the spec
+
+        Returns:
+            bool: True if anything was extracted
+        """
+        if not self.extracted:
+            return False
+        components = self.spec.setdefault("components", {})
+        components.setdefault(self.component_type, {}).update(self.extracted)
+        return True
+
+
+def parameter_name(container, key):
+    return container[key].get("name", "")
+
+
+def response_name(container, key):
+    return "Response{}".format(key)
+
+
+def schema_name(container, key):
+    title = container[key].get("title")
+    if title:
+        return title
+    if isinstance(key, str) and key != "schema" and key not in SCHEMA_KEYWORDS:
+        # property name
+        return key[:1].upper() + key[1:]
+    return "InlineSchema"
+
+
+def extract_slots(spec, component_type, threshold, name, iter_slots):
+    extractor = Extractor(spec, component_type, threshold, name)
+    slots = list(iter_slots(spec))
+    for container, key in slots:
+        extractor.count(container, key)
+    for container, key in slots:
+        extractor.replace(container, key)
+    return extractor.commit()
+
+
+def extract_components(spec, threshold=128):
+    """Moves repeated inline responses, parameters and schemas of a spec to its components
+
+    Responses are extracted first, then parameters, then schemas, which are extracted again until
+    no repeated schema is left, so nested repetitions are extracted at their outermost level.
+    Subtrees identical to an existing component are replaced by a reference to it.
+
+    Args:
+        spec (dict): spec dictionary, as returned by `OpenApi.to_dict`, updated in place
+        threshold (int): minimum size in bytes of the compact JSON encoding of extracted subtrees
+
+    Returns:
+        dict: `spec`
+    """
+    with stats.measure(stats.COMPONENT_ASSEMBLY):
+        extract_slots(spec, "responses", threshold, response_name, iter_response_slots)
+        extract_slots(spec, "parameters", threshold, parameter_name, iter_parameter_slots)
+        extracted = True
+        while extracted:
+            extractor = Extractor(spec, "schemas", threshold, schema_name)
+            walk_schema_slots(spec, extractor.count)
+            walk_schema_slots(spec, extractor.replace)
+            extracted = extractor.commit()
+    return spec
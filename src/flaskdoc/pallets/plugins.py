@@ -1,52 +1,66 @@
 """
 
 """
+import functools
+import re
 from collections import defaultdict
 
 API_SPECS = defaultdict(list)
+# functions in order of spec registration, the log length is the current specs revision
+SPEC_LOG = []
+# flask rule variable, with optional converter and converter arguments
+RULE_VARIABLE = re.compile(
+    r"<(?:(?P<converter>[a-zA-Z_][a-zA-Z0-9_]*)(?:\((?P<arguments>.*?)\))?:)?"
+    r"(?P<variable>[a-zA-Z_][a-zA-Z0-9_]*)>"
+)
 
 
 def register_spec(func, spec):
     API_SPECS[func].append(spec)
+    SPEC_LOG.append(func)
 
 
 def get_docs():
     return API_SPECS.items()
 
 
+def get_changes(revision):
+    """Returns the functions whose specs changed since a revision
+
+    Args:
+        revision (int): specs revision of the previous check, 0 for all functions
+
+    Returns:
+        tuple[list, int]: changed functions in order of first registration and current revision
+    """
+    changed = list(dict.fromkeys(SPEC_LOG[revision:]))
+    return changed, len(SPEC_LOG)
+
+
 def parse_flask_rule(rule: str):
-    """Parses a flask rule (URL), and returns an openapi compatible version of the url"""
+    """Parses a flask rule (URL), and returns an openapi compatible version of the url
+
+    Converters and their arguments are dropped, eg `/pets/<int(min=1):pet_id>` becomes
+    `/pets/{pet_id}`. Results are memoized per rule.
+    """
 
-    parsed_rule = []
-    index = -1
+    return _parse_rule(rule)[0]
 
-    while index < len(rule):
 
-        index += 1
-        if index > len(rule) - 1:
-            break
-        char = rule[index]
+def get_rule_variables(rule: str):
+    """Returns the variables of a flask rule (URL) in order of appearance
 
-        if char != "<":
-            parsed_rule.append(char)
-            continue
+    Args:
+        rule (str): flask rule, eg `/pets/<int(min=1):pet_id>`
 
-        # skip '<'
-        # only interested in variable name after ':'
-        variable_name = ["{"]
-        index += 1
-        cs = False  # colon seen flag
-        char = rule[index]
+    Returns:
+        tuple[str]: variable names, eg `("pet_id",)`
+    """
 
-        while char != ">":
-            if cs:
-                variable_name.append(char)
-            elif char == ":":
-                cs = True
-            index += 1
-            char = rule[index]
+    return _parse_rule(rule)[1]
 
-        variable_name.append("}")
-        parsed_rule += variable_name
 
-    return "".join(parsed_rule)
+@functools.lru_cache(maxsize=None)
+def _parse_rule(rule):
+    variables = tuple(match.group("variable") for match in RULE_VARIABLE.finditer(rule))
+    return RULE_VARIABLE.sub(r"{\g<variable>}", rule), variables
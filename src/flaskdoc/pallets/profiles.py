@@ -0,0 +1,78 @@
+""" Spec document profiles, variants of the spec for specific consumers
+
+    The `machine` profile is meant for gateways and code generators, it strips the fields only
+    humans read: descriptions, summaries, examples, external docs and `x-` extensions. Response
+    descriptions are required by the OpenAPI specification and are emptied instead.
+"""
+
+MACHINE = "machine"
+DOCUMENTATION_KEYS = frozenset(["description", "summary", "example", "examples", "externalDocs"])
+# objects whose keys are names chosen by users rather than fields
+NAMED_MAP_KEYS = frozenset(
+    [
+        "properties",
+        "paths",
+        "headers",
+        "content",
+        "responses",
+        "schemas",
+        "parameters",
+        "requestBodies",
+        "securitySchemes",
+        "links",
+        "callbacks",
+        "encoding",
+        "variables",
+        "mapping",
+        "scopes",
+    ]
+)
+# lists of objects whose keys are names chosen by users
+NAMED_MAP_LIST_KEYS = frozenset(["security"])
+# free form values, kept as is
+OPAQUE_KEYS = frozenset(["default", "enum"])
+
+
+def strip_documentation(spec):
+    """Returns a copy of a spec dictionary without the fields only meant for humans
+
+    Args:
+        spec (dict): spec dictionary, as returned by `OpenApi.to_dict`, left untouched
+
+    Returns:
+        dict: stripped spec dictionary
+    """
+    return _strip_object(spec)
+
+
+def _strip_object(node, is_response=False):
+    stripped = {}
+    for key, value in node.items():
+        if key in DOCUMENTATION_KEYS or key.startswith("x-"):
+            continue
+        if key in OPAQUE_KEYS:
+            stripped[key] = value
+        elif key in NAMED_MAP_KEYS and isinstance(value, dict):
+            is_responses = key == "responses"
+            stripped[key] = {
+                name: _strip_object(item, is_responses) if isinstance(item, dict) else item
+                for name, item in value.items()
+            }
+        elif key in NAMED_MAP_LIST_KEYS and isinstance(value, list):
+            stripped[key] = [dict(item) if isinstance(item, dict) else item for item in value]
+        else:
+            stripped[key] = _strip_value(value)
+    if is_response and "description" in node:
+        stripped["description"] = ""
+    return stripped
+
+
+def _strip_value(value):
+    if isinstance(value, dict):
+        return _strip_object(value)
+    if isinstance(value, list):
+        return [_strip_value(item) for item in value]
+    return value
+
+
+PROFILES = {MACHINE: strip_documentation}
@@ -0,0 +1,141 @@
+""" Self contained slices of an api spec
+
+    A slice keeps the paths of a tag or of a blueprint, the tags they use and only the component
+    schemas they reference, directly or through other schemas.
+"""
+import attr
+
+from flaskdoc import swagger
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+
+def iter_references(value):
+    """Yields every `$ref` of a spec dictionary, in depth first order
+
+    Args:
+        value (object): spec value converted with `to_dict`
+
+    Yields:
+        str: reference
+    """
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def reachable_schemas(roots, schemas):
+    """Returns the component schemas referenced by spec values, directly or through other schemas
+
+    Args:
+        roots (list): spec values converted with `to_dict`
+        schemas (dict[str, swagger.Schema]): component schemas keyed by name
+
+    Returns:
+        dict[str, swagger.Schema]: referenced schemas, in the order of `schemas`
+    """
+    schemas = schemas or {}
+    reached = set()
+    pending = list(roots)
+    while pending:
+        for ref in iter_references(pending.pop()):
+            if not ref.startswith(SCHEMA_REF_PREFIX):
+                continue
+            name = ref[len(SCHEMA_REF_PREFIX) :]
+            if name in schemas and name not in reached:
+                reached.add(name)
+                pending.append(schemas[name].to_dict())
+    return {name: schema for name, schema in schemas.items() if name in reached}
+
+
+def get_tags(operation):
+    return {getattr(tag, "name", tag) for tag in operation.tags or ()}
+
+
+def get_operations(path_item):
+    return {
+        method: getattr(path_item, method)
+        for method in HTTP_METHODS
+        if getattr(path_item, method) is not None
+    }
+
+
+def tag_names(api):
+    """Returns the names of the tags of a spec, declared or only used by operations
+
+    Args:
+        api (swagger.OpenApi): api spec
+
+    Returns:
+        list[str]: tag names, declared tags first
+    """
+    names = [tag.name for tag in api.tags or ()]
+    for path_item in api.paths.items.values():
+        for operation in get_operations(path_item).values():
+            names.extend(sorted(get_tags(operation)))
+    return list(dict.fromkeys(names))
+
+
+def tag_paths(api, tag):
+    """Returns the path items of a spec restricted to the operations with a tag
+
+    Args:
+        api (swagger.OpenApi): api spec
+        tag (str): tag name
+
+    Returns:
+        dict[str, swagger.PathItem]: path items with at least one tagged operation
+    """
+    paths = {}
+    for path, path_item in api.paths.items.items():
+        operations = get_operations(path_item)
+        untagged = {method: None for method, op in operations.items() if tag not in get_tags(op)}
+        if len(untagged) < len(operations):
+            paths[path] = attr.evolve(path_item, **untagged) if untagged else path_item
+    return paths
+
+
+def make_slice(api, paths):
+    """Creates a self contained spec holding some paths of an api spec
+
+    Components other than schemas are kept whole, the schemas they reference are kept as well.
+
+    Args:
+        api (swagger.OpenApi): complete api spec
+        paths (dict[str, swagger.PathItem]): path items of the slice
+
+    Returns:
+        swagger.OpenApi: sliced spec, None if `paths` is empty
+    """
+    if not paths:
+        return None
+    sliced_paths = swagger.Paths(items=paths)
+    used_tags = set()
+    for path_item in paths.values():
+        for operation in get_operations(path_item).values():
+            used_tags.update(get_tags(operation))
+
+    components = api.components
+    roots = [sliced_paths.to_dict()]
+    if components is not None:
+        roots.append(attr.evolve(components, schemas=None).to_dict())
+        components = attr.evolve(
+            components, schemas=reachable_schemas(roots, components.schemas) or None
+        )
+    return swagger.OpenApi(
+        info=api.info,
+        paths=sliced_paths,
+        version=api.openapi,
+        tags=[tag for tag in api.tags if tag.name in used_tags],
+        servers=api.servers,
+        external_docs=api.external_docs,
+        components=components,
+    )
@@ -0,0 +1,162 @@
+""" Phase level instrumentation of spec builds
+
+    Builds and document encodings are recorded as `BuildStats`, holding the wall time and the net
+    number of allocated memory blocks of each phase, and handed to the listeners registered with
+    the app. Nothing is measured while an app has no listeners.
+"""
+import collections
+import contextlib
+import logging
+import sys
+import threading
+import time
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+RULE_LOOKUP = "rule_lookup"
+PARSE_SPECS = "parse_specs"
+SCHEMA_REGISTRATION = "schema_registration"
+COMPONENT_ASSEMBLY = "component_assembly"
+SERIALIZATION = "serialization"
+ENCODING = "encoding"
+PHASES = (
+    RULE_LOOKUP,
+    PARSE_SPECS,
+    SCHEMA_REGISTRATION,
+    COMPONENT_ASSEMBLY,
+    SERIALIZATION,
+    ENCODING,
+)
+
+_active_records = threading.local()
+
+
+@attr.s
+class PhaseStats(object):
+    """Accumulated measurements of a phase
+
+    Properties:
+        wall_time (float): seconds spent in the phase
+        allocated_blocks (int): net number of memory blocks allocated by the phase
+        calls (int): number of times the phase ran
+    """
+
+    wall_time = attr.ib(default=0.0)
+    allocated_blocks = attr.ib(default=0)
+    calls = attr.ib(default=0)
+
+
+@attr.s
+class BuildStats(object):
+    """Measurements of a spec build or of a document encoding
+
+    Properties:
+        name (str): `build` for spec builds, the document format for encodings, eg `json`
+        started (float): unix timestamp of the start of the record
+        wall_time (float): seconds spent in total, phases included
+        phases (dict[str, PhaseStats]): measurements keyed by phase, in order of first use
+    """
+
+    name = attr.ib(type=str)
+    started = attr.ib(factory=time.time)
+    wall_time = attr.ib(default=0.0)
+    phases = attr.ib(factory=dict)
+
+    def add(self, phase, wall_time, allocated_blocks):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.wall_time += wall_time
+        stats.allocated_blocks += allocated_blocks
+        stats.calls += 1
+
+    def to_dict(self):
+        return attr.asdict(self)
+
+
+@contextlib.contextmanager
+def record(name, listeners):
+    """Records the phases measured in the current thread and hands the record to listeners
+
+    Args:
+        name (str): record name
+        listeners (list[callable]): functions called with the finished `BuildStats`, nothing is
+            recorded if empty
+
+    Yields:
+        BuildStats: active record, None if there are no listeners
+    """
+    if not listeners:
+        yield None
+        return
+
+    stats = BuildStats(name=name)
+    previous = getattr(_active_records, "record", None)
+    _active_records.record = stats
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall_time = time.perf_counter() - start
+        _active_records.record = previous
+
+    for listener in listeners:
+        try:
+            listener(stats)
+        except Exception:
+            logger.exception("Build stats listener %r failed", listener)
+
+
+@contextlib.contextmanager
+def measure(phase):
+    """Measures a phase into the record active in the current thread, if any
+
+    Args:
+        phase (str): phase name, one of `PHASES`
+    """
+    stats = getattr(_active_records, "record", None)
+    if stats is None:
+        yield
+        return
+
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(phase, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+
+
+def log_stats(stats):
+    """Listener logging every record to the `flaskdoc.pallets.stats` logger at info level"""
+
+    logger.info(
+        "%s took %.2fms: %s",
+        stats.name,
+        stats.wall_time * 1000,
+        ", ".join(
+            "{} {:.2f}ms {:+d} blocks".format(phase, s.wall_time * 1000, s.allocated_blocks)
+            for phase, s in stats.phases.items()
+        ),
+    )
+
+
+class StatsCollector(object):
+    """Listener keeping the most recent records, served by the ``<docs_path>/_stats`` endpoint
+
+    Args:
+        maxlen (int): number of records kept
+    """
+
+    def __init__(self, maxlen=100):
+        self._records = collections.deque(maxlen=maxlen)
+
+    def __call__(self, stats):
+        self._records.append(stats.to_dict())
+
+    def records(self):
+        """Returns the kept records as dictionaries, oldest first"""
+
+        return list(self._records)
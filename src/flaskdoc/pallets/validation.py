@@ -0,0 +1,512 @@
+""" Request body validation compiled from the documented schemas
+
+    Each operation's `RequestBody` schema is compiled once into nested Python closures, with the
+    constraints resolved ahead of time: regular expressions are precompiled, enums are looked up
+    in frozensets and required properties are checked against a frozenset. Validation is opt-in,
+    see `validate_requests`.
+
+    Examples:
+        >>> blp = flask.Blueprint("inventory", __name__)
+        >>> validate_requests(blp)
+"""
+import json
+import re
+
+import flask
+from werkzeug.exceptions import BadRequest
+
+from flaskdoc import swagger
+from flaskdoc.pallets import documents, plugins
+
+# json media types are validated, other request bodies are passed through
+JSON_MIMETYPE = "application/json"
+
+
+class ValidationError(BadRequest):
+    """Raised when a request body does not match its documented schema, responds with `400`
+
+    Properties:
+        errors (list[tuple[str, str]]): `(path, message)` pairs, paths are json pointers into the
+            request body
+    """
+
+    def __init__(self, errors):
+        description = "; ".join("{}: {}".format(path or "/", message) for path, message in errors)
+        super(ValidationError, self).__init__(description=description)
+        self.errors = errors
+
+    def get_body(self, *args, **kwargs):
+        return json.dumps(
+            dict(
+                code=self.code,
+                message="Request body failed validation",
+                errors=[dict(path=path or "/", message=message) for path, message in self.errors],
+            )
+        )
+
+    def get_headers(self, *args, **kwargs):
+        return [("Content-Type", JSON_MIMETYPE)]
+
+
+def is_json_mimetype(mimetype):
+    return mimetype == JSON_MIMETYPE or mimetype.endswith("+json")
+
+
+def _is_integer(value):
+    if type(value) is int:
+        return True
+    return type(value) is float and value.is_integer()
+
+
+def _is_number(value):
+    return type(value) in (int, float)
+
+
+TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: type(value) is bool,
+    "array": lambda value: type(value) is list,
+    "object": lambda value: type(value) is dict,
+}
+
+
+class SchemaCompiler(object):
+    """Compiles schemas into validator functions
+
+    A validator is called with the value to check, its json pointer and a list collecting
+    `(path, message)` errors. References are resolved through the schema factory, compiled once
+    per name and may be recursive.
+
+    Args:
+        schema_factory (swagger.SchemaFactory): registry resolving schema references
+    """
+
+    def __init__(self, schema_factory):
+        self.schema_factory = schema_factory
+        # id of compiled schema to the schema and its validator, the schema is kept alive
+        self.compiled = {}
+        self.references = {}
+
+    def compile(self, schema):
+        """Returns the validator of a schema
+
+        Args:
+            schema (swagger.Schema): schema to compile
+
+        Returns:
+            callable: validator function `(value, path, errors)`
+        """
+        entry = self.compiled.get(id(schema))
+        if entry is None:
+            entry = self.compiled[id(schema)] = (schema, self._compile(schema))
+        return entry[1]
+
+    def compile_reference(self, ref):
+        name = ref.rsplit("/", 1)[-1]
+        validator = self.references.get(name)
+        if validator is not None:
+            return validator
+
+        target = self.schema_factory.schemas.get(name)
+        if target is None:
+            # unknown components are not validated
+            return _accept
+
+        references = self.references
+
+        def validate_reference(value, path, errors):
+            # resolved on call, the referenced schema may refer back to itself
+            references[name](value, path, errors)
+
+        references[name] = validate_reference
+        references[name] = self.compile(target)
+        return references[name]
+
+    def _compile(self, schema):
+        if schema.ref:
+            return self.compile_reference(schema.ref)
+
+        checks = []
+        if schema.enum is not None:
+            checks.append(_enum_check(schema.enum))
+        checks += _string_checks(schema)
+        checks += _number_checks(schema)
+        checks += self._array_checks(schema)
+        checks += self._object_checks(schema)
+        checks += self._composite_checks(schema)
+        checks = tuple(checks)
+
+        type_check = TYPE_CHECKS.get(schema.type)
+        type_error = "is not of type '{}'".format(schema.type)
+        nullable = bool(schema.nullable)
+
+        def validate(value, path, errors):
+            if value is None:
+                if nullable or type_check is None:
+                    return
+                errors.append((path, type_error))
+                return
+            if type_check is not None and not type_check(value):
+                errors.append((path, type_error))
+                return
+            for check in checks:
+                check(value, path, errors)
+
+        return validate
+
+    def _array_checks(self, schema):
+        checks = []
+        min_items, max_items = schema.min_items, schema.max_items
+        if min_items is not None:
+
+            def check_min_items(value, path, errors):
+                if type(value) is list and len(value) < min_items:
+                    errors.append((path, "has fewer than {} items".format(min_items)))
+
+            checks.append(check_min_items)
+        if max_items is not None:
+
+            def check_max_items(value, path, errors):
+                if type(value) is list and len(value) > max_items:
+                    errors.append((path, "has more than {} items".format(max_items)))
+
+            checks.append(check_max_items)
+        if schema.unique_items:
+            checks.append(_check_unique_items)
+        if isinstance(schema.items, swagger.Schema):
+            validate_item = self.compile(schema.items)
+
+            def check_items(value, path, errors):
+                if type(value) is list:
+                    for index, item in enumerate(value):
+                        validate_item(item, "{}/{}".format(path, index), errors)
+
+            checks.append(check_items)
+        return checks
+
+    def _object_checks(self, schema):
+        checks = _property_count_checks(schema)
+        properties = schema.properties or {}
+        # read only properties are not sent in requests
+        read_only = frozenset(
+            name
+            for name, prop in properties.items()
+            if isinstance(prop, swagger.Schema) and prop.read_only
+        )
+        required = frozenset(getattr(schema, "required", None) or ()) - read_only
+        if required:
+            ordered = tuple(sorted(required))
+
+            def check_required(value, path, errors):
+                if type(value) is dict and not required.issubset(value):
+                    for name in ordered:
+                        if name not in value:
+                            errors.append((path, "'{}' is a required property".format(name)))
+
+            checks.append(check_required)
+
+        validators = tuple(
+            (name, "/" + name, self.compile(prop))
+            for name, prop in properties.items()
+            if isinstance(prop, swagger.Schema) and name not in read_only
+        )
+        if validators:
+
+            def check_properties(value, path, errors):
+                if type(value) is dict:
+                    for name, pointer, validate in validators:
+                        if name in value:
+                            validate(value[name], path + pointer, errors)
+
+            checks.append(check_properties)
+
+        checks += self._additional_properties_checks(schema)
+        return checks
+
+    def _additional_properties_checks(self, schema):
+        checks = []
+        additional = schema.additional_properties
+        known = frozenset(schema.properties or ())
+        if additional is False:
+
+            def check_additional_properties(value, path, errors):
+                if type(value) is dict and not known.issuperset(value):
+                    for name in value:
+                        if name not in known:
+                            errors.append((path, "'{}' is not an allowed property".format(name)))
+
+            checks.append(check_additional_properties)
+        elif isinstance(additional, swagger.Schema):
+            validate_additional = self.compile(additional)
+
+            def check_additional_schema(value, path, errors):
+                if type(value) is dict:
+                    for name, item in value.items():
+                        if name not in known:
+                            validate_additional(item, path + "/" + name, errors)
+
+            checks.append(check_additional_schema)
+        return checks
+
+    def _composite_checks(self, schema):
+        checks = []
+        for sub_schema in schema.all_of or ():
+            checks.append(self.compile(sub_schema))
+        if schema.any_of:
+            any_of = tuple(self.compile(s) for s in schema.any_of)
+
+            def check_any_of(value, path, errors):
+                if not any(_matches(validate, value, path) for validate in any_of):
+                    errors.append((path, "does not match any of the allowed schemas"))
+
+            checks.append(check_any_of)
+        if schema.one_of:
+            one_of = tuple(self.compile(s) for s in schema.one_of)
+
+            def check_one_of(value, path, errors):
+                if sum(_matches(validate, value, path) for validate in one_of) != 1:
+                    errors.append((path, "does not match exactly one of the allowed schemas"))
+
+            checks.append(check_one_of)
+        return checks
+
+
+def _accept(value, path, errors):
+    return None
+
+
+def _matches(validate, value, path):
+    errors = []
+    validate(value, path, errors)
+    return not errors
+
+
+def _enum_check(enum):
+    try:
+        allowed = frozenset(enum)
+    except TypeError:
+        # unhashable members, fall back to a linear scan
+        allowed = tuple(enum)
+    message = "is not one of {}".format(list(enum))
+
+    def check_enum(value, path, errors):
+        try:
+            if value in allowed:
+                return
+        except TypeError:
+            pass
+        errors.append((path, message))
+
+    return check_enum
+
+
+def _property_count_checks(schema):
+    checks = []
+    min_properties, max_properties = schema.min_properties, schema.max_properties
+    if min_properties is not None:
+
+        def check_min_properties(value, path, errors):
+            if type(value) is dict and len(value) < min_properties:
+                errors.append((path, "has fewer than {} properties".format(min_properties)))
+
+        checks.append(check_min_properties)
+    if max_properties is not None:
+
+        def check_max_properties(value, path, errors):
+            if type(value) is dict and len(value) > max_properties:
+                errors.append((path, "has more than {} properties".format(max_properties)))
+
+        checks.append(check_max_properties)
+    return checks
+
+
+def _string_checks(schema):
+    checks = []
+    min_length, max_length = schema.min_length, schema.max_length
+    if min_length is not None:
+
+        def check_min_length(value, path, errors):
+            if isinstance(value, str) and len(value) < min_length:
+                errors.append((path, "is shorter than {}".format(min_length)))
+
+        checks.append(check_min_length)
+    if max_length is not None:
+
+        def check_max_length(value, path, errors):
+            if isinstance(value, str) and len(value) > max_length:
+                errors.append((path, "is longer than {}".format(max_length)))
+
+        checks.append(check_max_length)
+    if schema.pattern:
+        search = re.compile(schema.pattern).search
+        message = "does not match '{}'".format(schema.pattern)
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and search(value) is None:
+                errors.append((path, message))
+
+        checks.append(check_pattern)
+    return checks
+
+
+def _number_checks(schema):
+    checks = []
+    minimum, maximum = schema.minimum, schema.maximum
+    if minimum is not None:
+        exclusive = bool(schema.exclusive_minimum)
+        message = "is less than {}{}".format("or equal to " if exclusive else "", minimum)
+
+        def check_minimum(value, path, errors):
+            if _is_number(value) and (value <= minimum if exclusive else value < minimum):
+                errors.append((path, message))
+
+        checks.append(check_minimum)
+    if maximum is not None:
+        exclusive = bool(schema.exclusive_maximum)
+        message = "is greater than {}{}".format("or equal to " if exclusive else "", maximum)
+
+        def check_maximum(value, path, errors):
+            if _is_number(value) and (value >= maximum if exclusive else value > maximum):
+                errors.append((path, message))
+
+        checks.append(check_maximum)
+    multiple_of = schema.multiple_of
+    if multiple_of:
+        message = "is not a multiple of {}".format(multiple_of)
+
+        def check_multiple_of(value, path, errors):
+            if _is_number(value):
+                quotient = value / multiple_of
+                if abs(quotient - round(quotient)) > 1e-9:
+                    errors.append((path, message))
+
+        checks.append(check_multiple_of)
+    return checks
+
+
+def _check_unique_items(value, path, errors):
+    if type(value) is not list:
+        return
+    try:
+        unique = len(set(value)) == len(value)
+    except TypeError:
+        keys = [json.dumps(item, sort_keys=True) for item in value]
+        unique = len(set(keys)) == len(keys)
+    if not unique:
+        errors.append((path, "has non-unique items"))
+
+
+def compile_request_body(request_body, compiler):
+    """Compiles the validator of a request body
+
+    Only json media types are validated.
+
+    Args:
+        request_body (swagger.RequestBody): documented request body
+        compiler (SchemaCompiler): schema compiler
+
+    Returns:
+        callable|None: function validating a `flask.Request`, None if there is nothing to validate
+    """
+    if not isinstance(request_body, swagger.RequestBody) or not request_body.content:
+        return None
+
+    validators = {}
+    for content_type, media in request_body.content.items():
+        schema = media.get("schema")
+        if is_json_mimetype(content_type) and isinstance(schema, swagger.Schema):
+            validators[content_type] = compiler.compile(schema)
+    required = bool(request_body.required)
+    if not validators and not required:
+        return None
+    default = validators.get(JSON_MIMETYPE) or next(iter(validators.values()), None)
+
+    def validate_request_body(request):
+        if not request.content_length and not request.data:
+            if required:
+                raise ValidationError([("", "request body is required")])
+            return
+        if not is_json_mimetype(request.mimetype):
+            return
+        validate = validators.get(request.mimetype, default)
+        if validate is None:
+            return
+        body = request.get_json(silent=True)
+        if body is None:
+            raise ValidationError([("", "request body is not valid json")])
+        errors = []
+        validate(body, "", errors)
+        if errors:
+            raise ValidationError(errors)
+
+    return validate_request_body
+
+
+def get_request_body(func, method):
+    """Returns the documented request body of a view function for a http method
+
+    Args:
+        func (callable): view function
+        method (str): http method, eg `POST`
+
+    Returns:
+        swagger.RequestBody|None: request body, None if not documented
+    """
+    for model in plugins.API_SPECS.get(func, ()):
+        if isinstance(model, swagger.PathItem):
+            operation = getattr(model, method.lower(), None)
+            if operation is not None and operation.request_body is not None:
+                return operation.request_body
+        elif isinstance(model, swagger.Operation) and model.http_method is not None:
+            if model.http_method.value.upper() == method:
+                return model.request_body
+    return None
+
+
+def validate_request():
+    """Validates the current request body against the schema documented for its view
+
+    Validators are compiled on first use and cached per view function and method in the app's
+    flaskdoc state.
+
+    Raises:
+        ValidationError: if the request body is invalid
+    """
+    request = flask.request
+    app = flask.current_app
+    func = app.view_functions.get(request.endpoint)
+    if func is None:
+        return
+
+    state = documents.get_state(app)
+    validators = state.get("validators")
+    if validators is None:
+        validators = state.setdefault("validators", {})
+    key = (func, request.method)
+    if key not in validators:
+        with state["lock"]:
+            compiler = state.get("compiler")
+            if compiler is None:
+                factory = state.get("schema_factory", swagger.schema_factory)
+                compiler = state["compiler"] = SchemaCompiler(factory)
+            request_body = get_request_body(func, request.method)
+            validators[key] = compile_request_body(request_body, compiler)
+
+    validator = validators[key]
+    if validator is not None:
+        validator(request)
+
+
+def validate_requests(scaffold):
+    """Enables request body validation for all views of a blueprint or app
+
+    Args:
+        scaffold (flask.Blueprint|flask.Flask): blueprint or app to validate requests of
+
+    Returns:
+        flask.Blueprint|flask.Flask: `scaffold`, for chaining
+    """
+    scaffold.before_request(validate_request)
+    return scaffold
@@ -62,6 +62,7 @@ from flaskdoc.swagger.schema import (
     Image,
     Int64,
     Integer,
+    InternedSchemaError,
     JsonType,
     MediaType,
     MultipartFormData,
@@ -74,5 +75,6 @@ from flaskdoc.swagger.schema import (
     String,
     UrlEncodedFormType,
     XmlType,
+    get_schema_factory,
     schema_factory,
 )
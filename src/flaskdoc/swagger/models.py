@@ -9,7 +9,7 @@ import attr
 
 from flaskdoc.core import ApiDecoratorMixin, DictMixin, ExtensionMixin, ModelMixin
 from flaskdoc.swagger import validators
-from flaskdoc.swagger.schema import ContentMixin, schema_factory
+from flaskdoc.swagger.schema import ContentMixin, get_schema_factory
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +17,18 @@ logger = logging.getLogger(__name__)
 class SwaggerDict(OrderedDict, DictMixin):
     """Used to filter out properties that are not set"""
 
+    __slots__ = ()
+
     def __setitem__(self, key, value):
         if value not in [False, True] and not value:
             return
         super(SwaggerDict, self).__setitem__(key, value)
 
 
-@attr.s
+@attr.s(slots=True)
 class ContainerModel(ModelMixin):
 
-    items = attr.ib(default=SwaggerDict())
+    items = attr.ib(factory=SwaggerDict)
 
     def add(self, key, item):
         """Adds an item
@@ -46,8 +48,11 @@ class ContainerModel(ModelMixin):
     def to_dict(self):
         return self.parse(self.items)
 
+    def iter_items(self):
+        return self.iter_parse(self.items)
+
 
-@attr.s
+@attr.s(slots=True)
 class License(ExtensionMixin):
     """License information for the exposed API.
 
@@ -60,7 +65,7 @@ class License(ExtensionMixin):
 
     name = attr.ib(type=str)
     url = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @url.validator
     def validate(self, _, url):
@@ -68,7 +73,7 @@ class License(ExtensionMixin):
             validators.validate_url(url, "License.url")
 
 
-@attr.s
+@attr.s(slots=True)
 class Contact(ExtensionMixin):
     """Contact information for the exposed API.
 
@@ -83,7 +88,7 @@ class Contact(ExtensionMixin):
     name = attr.ib(default=None, type=str)
     email = attr.ib(default=None, type=str)
     url = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @url.validator
     def validate(self, _, url):
@@ -91,7 +96,7 @@ class Contact(ExtensionMixin):
             validators.validate_url(url, "Contact.url")
 
 
-@attr.s
+@attr.s(slots=True)
 class Info(ExtensionMixin):
     """The object provides metadata about the API.
 
@@ -114,10 +119,10 @@ class Info(ExtensionMixin):
     terms_of_service = attr.ib(default=None, type=str)
     contact = attr.ib(default=None, type=Contact)
     license = attr.ib(default=None, type=License)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class ServerVariable(ExtensionMixin):
     """An object representing a Server Variable for server URL template substitution.
 
@@ -136,10 +141,10 @@ class ServerVariable(ExtensionMixin):
     default = attr.ib(type=str)
     enum = attr.ib(default=None, type=list)
     description = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class Server(ExtensionMixin):
     """An object representing a Server.
 
@@ -158,7 +163,7 @@ class Server(ExtensionMixin):
     url = attr.ib(type=str)
     description = attr.ib(default=None, type=str)
     variables = attr.ib(default=None, type=dict)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def add_variable(self, name: str, variable: ServerVariable):
         """Adds a server variable
@@ -189,7 +194,7 @@ class Style(enum.Enum):
         return self.value
 
 
-@attr.s
+@attr.s(slots=True)
 class ReferenceObject(ModelMixin):
 
     ref = attr.ib(type=str)
@@ -204,39 +209,39 @@ class ReferenceObject(ModelMixin):
         return {"$ref": self.ref}
 
 
-@attr.s
+@attr.s(slots=True)
 class ExampleReference(ReferenceObject):
     _ref_object = attr.ib(default="examples", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class LinkReference(ReferenceObject):
     _ref_object = attr.ib(default="links", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class ExternalDocumentation(ExtensionMixin):
     """Allows referencing an external resource for extended documentation."""
 
     url = attr.ib(type=str)
     description = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class RequestBody(ContentMixin, ExtensionMixin):
 
     description = attr.ib(default=None, type=str)
     required = attr.ib(default=None)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class RelativePath(object):
 
     url = attr.ib(type=str)
     len = attr.ib(default=0, type=int)
-    params = attr.ib(default={})
+    params = attr.ib(factory=dict)
 
     def __attrs_post_init__(self):
         self.parse(self.url)
@@ -269,7 +274,7 @@ class ParameterLocation(enum.Enum):
         return self.value
 
 
-@attr.s
+@attr.s(slots=True)
 class Parameter(ExtensionMixin, ApiDecoratorMixin):
     """
     Describes a single operation parameter.
@@ -289,7 +294,7 @@ class Parameter(ExtensionMixin, ApiDecoratorMixin):
     _style = attr.ib(default=None, type=Style, init=False)
     example = attr.ib(default=None)
     examples = attr.ib(default=None, type=dict)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @property
     def q_in(self):
@@ -301,7 +306,7 @@ class Parameter(ExtensionMixin, ApiDecoratorMixin):
 
     def __attrs_post_init__(self):
         if self.schema:
-            self.schema = schema_factory.get_schema(self.schema)
+            self.schema = get_schema_factory().get_schema(self.schema)
 
     def merge(self, parameter):
         if self.required is None:
@@ -312,7 +317,7 @@ class Parameter(ExtensionMixin, ApiDecoratorMixin):
             self.content = parameter.content
 
 
-@attr.s
+@attr.s(slots=True)
 class PathParameter(Parameter):
 
     _in = attr.ib(default=ParameterLocation.PATH, init=False)
@@ -320,35 +325,35 @@ class PathParameter(Parameter):
     _style = attr.ib(default=Style.SIMPLE, init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class QueryParameter(Parameter):
 
     _in = attr.ib(default=ParameterLocation.QUERY, init=False)
     _style = attr.ib(default=Style.FORM, init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class HeaderParameter(Parameter):
 
     _in = attr.ib(default=ParameterLocation.HEADER, init=False)
     _style = attr.ib(default=Style.SIMPLE, init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class CookieParameter(Parameter):
 
     _in = attr.ib(default=ParameterLocation.COOKIE, init=False)
     _style = attr.ib(default=Style.FORM, init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Header(HeaderParameter):
 
     name = attr.ib(default=None, init=False)
     _in = attr.ib(default=None, init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Link(ExtensionMixin):
     """
     The Link object represents a possible design-time link for a response. The presence of a link does not guarantee
@@ -365,10 +370,10 @@ class Link(ExtensionMixin):
     parameters = attr.ib(default=None, type=SwaggerDict)
     request_body = attr.ib(default=None)
     server = attr.ib(default=None, type=Server)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class ResponseObject(ContentMixin, ExtensionMixin):
     """
     Describes a single response from an API Operation, including design-time, static links to operations based on
@@ -379,7 +384,7 @@ class ResponseObject(ContentMixin, ExtensionMixin):
     content = attr.ib(default=None, type=SwaggerDict)
     headers = attr.ib(default=None, type=SwaggerDict)
     links = attr.ib(default=None, type=SwaggerDict)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def add_header(self, name: str, header: Union[ReferenceObject, HeaderParameter]):
         if self.headers is None:
@@ -392,7 +397,7 @@ class ResponseObject(ContentMixin, ExtensionMixin):
         self.links[link_name] = link
 
 
-@attr.s
+@attr.s(slots=True)
 class ResponsesObject(ExtensionMixin):
     """
     A container for the expected responses of an operation. The container maps a HTTP response code to the
@@ -405,25 +410,25 @@ class ResponsesObject(ExtensionMixin):
 
     default = attr.ib(default=None, type=ResponseObject)
     responses = attr.ib(default=None, type=dict)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def add_response(self, status_code: str, response: ResponseObject):
         self.responses[status_code] = response
 
 
-@attr.s
+@attr.s(slots=True)
 class Tag(ExtensionMixin, ApiDecoratorMixin):
 
     name = attr.ib(type=str)
     description = attr.ib(default=None, type=str)
     external_docs = attr.ib(default=None, type=ExternalDocumentation)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def external_doc(self, url, description=None):
         self.external_docs = ExternalDocumentation(url=url, description=description)
 
 
-@attr.s
+@attr.s(slots=True)
 class Operation(ExtensionMixin, ApiDecoratorMixin):
     """Describes a single API operation on a path."""
 
@@ -439,7 +444,7 @@ class Operation(ExtensionMixin, ApiDecoratorMixin):
     deprecated = attr.ib(default=None)
     security = attr.ib(default=None, type=list)
     servers = attr.ib(default=None, type=list)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @property
     def http_method(self):
@@ -473,7 +478,7 @@ class Operation(ExtensionMixin, ApiDecoratorMixin):
             return HEAD(responses=responses)
 
 
-@attr.s
+@attr.s(slots=True)
 class PathItem(ExtensionMixin):
     """
     Describes the operations available on a single path. A Path Item MAY be empty, due to ACL constraints. The
@@ -496,7 +501,7 @@ class PathItem(ExtensionMixin):
     post = attr.ib(default=None, type=Operation)
     put = attr.ib(default=None, type=Operation)
     trace = attr.ib(default=None, type=Operation)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def add_operation(self, operation):
         """
@@ -519,6 +524,8 @@ class PathItem(ExtensionMixin):
         self.servers.append(server)
 
     def add_parameter(self, parameter):
+        if self.parameters is None:
+            self.parameters = []
         for param in self.parameters:
             if param.name == parameter.name:
                 # previously added
@@ -554,6 +561,8 @@ class Paths(ContainerModel):
     from the Server Object in order to construct the full URL. The Paths MAY be empty, due to ACL constraints.
     """
 
+    __slots__ = ()
+
     def add(self, relative_url, path_item):
         """
         Adds a path item
@@ -569,56 +578,56 @@ class Paths(ContainerModel):
         super(Paths, self).add(relative_url, path_item)
 
 
-@attr.s
+@attr.s(slots=True)
 class GET(Operation):
     @property
     def http_method(self):
         return HttpMethod.GET
 
 
-@attr.s
+@attr.s(slots=True)
 class POST(Operation):
     @property
     def http_method(self):
         return HttpMethod.POST
 
 
-@attr.s
+@attr.s(slots=True)
 class PUT(Operation):
     @property
     def http_method(self):
         return HttpMethod.PUT
 
 
-@attr.s
+@attr.s(slots=True)
 class HEAD(Operation):
     @property
     def http_method(self):
         return HttpMethod.HEAD
 
 
-@attr.s
+@attr.s(slots=True)
 class OPTIONS(Operation):
     @property
     def http_method(self):
         return HttpMethod.OPTIONS
 
 
-@attr.s
+@attr.s(slots=True)
 class PATCH(Operation):
     @property
     def http_method(self):
         return HttpMethod.PATCH
 
 
-@attr.s
+@attr.s(slots=True)
 class TRACE(Operation):
     @property
     def http_method(self):
         return HttpMethod.TRACE
 
 
-@attr.s
+@attr.s(slots=True)
 class DELETE(Operation):
     @property
     def http_method(self):
@@ -636,7 +645,7 @@ class HttpMethod(enum.Enum):
     TRACE = "TRACE"
 
 
-@attr.s
+@attr.s(slots=True)
 class Callback(ModelMixin):
     """
     A map of possible out-of band callbacks related to the parent operation. Each value in the map is a Path Item
@@ -656,7 +665,7 @@ class SecuritySchemeType(enum.Enum):
     OPEN_ID_CONNECT = "openIdConnect"
 
 
-@attr.s
+@attr.s(slots=True)
 class SecurityScheme(ExtensionMixin):
     """Defines a security scheme that can be used by the operations.
 
@@ -672,7 +681,7 @@ class SecurityScheme(ExtensionMixin):
             return self._type.value
 
 
-@attr.s
+@attr.s(slots=True)
 class ApiKeySecurityScheme(SecurityScheme):
     """OpenAPI security scheme definition with type apiKey
 
@@ -689,14 +698,14 @@ class ApiKeySecurityScheme(SecurityScheme):
     _type = attr.ib(default=SecuritySchemeType.API_KEY, init=False)
     _in = attr.ib(default=ParameterLocation.HEADER, init=False)
     description = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @property
     def q_in(self):
         return self._in.value
 
 
-@attr.s
+@attr.s(slots=True)
 class HttpSecurityScheme(SecurityScheme):
     """OpenAPI security scheme definition with type http"""
 
@@ -704,16 +713,16 @@ class HttpSecurityScheme(SecurityScheme):
     bearer_format = attr.ib(default="bearer")
     description = attr.ib(default=None, type=str)
     _type = attr.ib(default=SecuritySchemeType.HTTP, init=False)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
-@attr.s
+@attr.s(slots=True)
 class OpenIDConnectScheme(SecurityScheme):
     """OpenAPI security scheme definition with type openidConnect"""
 
     open_id_connect_url = attr.ib(type=str)
     _type = attr.ib(default=SecuritySchemeType.OPEN_ID_CONNECT, init=False)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     @open_id_connect_url.validator
     def validate(self, _, url):
@@ -721,13 +730,13 @@ class OpenIDConnectScheme(SecurityScheme):
             validators.validate_url(url, "OpenIDConnectScheme.open_id_connect_url")
 
 
-@attr.s
+@attr.s(slots=True)
 class OAuth2SecurityScheme(SecurityScheme):
     """OpenAPI security scheme definition with type oauth2"""
 
     flows = attr.ib()
     _type = attr.ib(default=SecuritySchemeType.OAUTH2, init=False)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
 class ImplicitOAuthFlow(ExtensionMixin):
@@ -785,7 +794,7 @@ class ClientCredentialsOAuthFlow(ExtensionMixin):
         )
 
 
-@attr.s
+@attr.s(slots=True)
 class OAuthFlow(ExtensionMixin):
     """Configuration details for a supported OAuth Flow"""
 
@@ -793,7 +802,7 @@ class OAuthFlow(ExtensionMixin):
     token_url = attr.ib(type=str)
     refresh_url = attr.ib(type=str)
     scopes = attr.ib(type={})
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
 
 class ComponentType(enum.Enum):
@@ -809,7 +818,7 @@ class ComponentType(enum.Enum):
     SECURITY_SCHEME = "security_schemes"
 
 
-@attr.s
+@attr.s(slots=True)
 class Components(ExtensionMixin):
     """Holds a set of reusable objects for different aspects of the OAS.
 
@@ -826,7 +835,7 @@ class Components(ExtensionMixin):
     security_schemes = attr.ib(default=None, type=dict)
     links = attr.ib(default=None, type=dict)
     callbacks = attr.ib(default=None, type=dict)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     PATTERN = re.compile("^[a-zA-Z0-9.-_]+$")
 
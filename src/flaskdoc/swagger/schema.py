@@ -13,9 +13,12 @@
 
     Also provides some common mime types like JsonType, XmlType
 """
-import collections
+import collections.abc
+import contextlib
 import enum
-import inspect
+import threading
+import types
+import typing
 from collections import defaultdict
 from typing import AnyStr, ByteString, Dict, List, Set, Text, Union
 
@@ -23,14 +26,42 @@ import attr
 
 from flaskdoc.core import ExtensionMixin, ModelMixin
 
+try:
+    import dataclasses
+except ImportError:  # pragma: no cover, python 3.6 without the dataclasses backport
+    dataclasses = None
 
-@attr.s
+# structural key to interned schema, and id of interned schema to its cached dict form
+INTERNED_SCHEMAS = {}
+INTERNED_DICTS = {}
+# resolved `(name, type)` field plans keyed by class
+FIELD_PLANS = {}
+# class attributes of plain classes that are not fields
+NON_FIELD_MEMBERS = (types.FunctionType, staticmethod, classmethod, property)
+
+
+class InternedSchemaError(attr.exceptions.FrozenInstanceError):
+    """Raised when assigning to an interned schema"""
+
+    def __init__(self):
+        super(InternedSchemaError, self).__init__()
+        self.msg = "interned schemas are shared, copy them with attr.evolve before changing them"
+        self.args = (self.msg,)
+
+
+@attr.s(slots=True)
 class Schema(ModelMixin):
     """The Schema Object allows the definition of input and output data types.
 
     These types can be objects, but also primitives and arrays. This object is an extended subset of the JSON Schema
     Specification Wright Draft 00. For more information about the properties, see JSON Schema Core and JSON Schema
     Validation. Unless stated otherwise, the property definitions follow the JSON Schema.
+
+    Primitive, reference and enum schemas returned by `SchemaFactory.get_schema`, `jo` fields and
+    `MediaType.to_schema` are interned, ie shared, and immutable. Assigning to them, `convert_props`
+    included, raises `attr.exceptions.FrozenInstanceError`, change a copy instead::
+
+        schema = attr.evolve(schema_factory.get_schema(str), description="name")
     """
 
     ref = attr.ib(default=None, type=str)
@@ -72,10 +103,28 @@ class Schema(ModelMixin):
     def q_not(self):
         return self._not
 
+    def __setattr__(self, name, value):
+        if id(self) in INTERNED_DICTS:
+            raise InternedSchemaError()
+        super(Schema, self).__setattr__(name, value)
+
+    def to_dict(self):
+        if id(self) not in INTERNED_DICTS:
+            return super(Schema, self).to_dict()
+        # interned schemas never change, their dict form is computed once
+        cached = INTERNED_DICTS[id(self)]
+        if cached is None:
+            cached = INTERNED_DICTS[id(self)] = super(Schema, self).to_dict()
+        return cached
+
+    def iter_items(self):
+        # kept so `documents.streams_items` streams schemas despite the `to_dict` override above
+        return super(Schema, self).iter_items()
+
     def __attrs_post_init__(self):
         # register schema
         if self.items:
-            self.items = schema_factory.get_schema(self.items)
+            self.items = get_schema_factory().get_schema(self.items)
         if isinstance(self.xml, str):
             self.xml = XML(name=self.xml)
 
@@ -87,60 +136,60 @@ class Schema(ModelMixin):
             props = {}
             for k, v in self.properties.items():
                 if not isinstance(v, Schema):
-                    props[k] = schema_factory.get_schema(v)
+                    props[k] = get_schema_factory().get_schema(v)
                 else:
                     props[k] = v
             self.properties = props
 
 
-@attr.s
+@attr.s(slots=True)
 class Boolean(Schema):
     example = attr.ib(default=None, type=bool)
     type = attr.ib(default="boolean", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class String(Schema):
     example = attr.ib(default=None, type=str)
     type = attr.ib(default="string", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Email(String):
     type = attr.ib(default="string", init=False)
     format = attr.ib(default="email", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Number(Schema):
     example = attr.ib(default=None, type=float)
     type = attr.ib(default="number", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Integer(Number):
     type = attr.ib(default="integer", init=False)
     format = attr.ib(default="int32", type=str)
     example = attr.ib(default=None, type=int)
 
 
-@attr.s
+@attr.s(slots=True)
 class Base64String(String):
     format = attr.ib(default="base64", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class BinaryString(String):
     format = attr.ib(default="binary", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Object(Schema):
     type = attr.ib(default="object", init=False)
     required = attr.ib(default=None, type=list)
 
 
-@attr.s
+@attr.s(slots=True)
 class XML(ModelMixin):
     """A metadata object that allows for more fine-tuned XML model definitions. When using arrays, XML element names
     are not inferred (for singular/plural forms) and the name property SHOULD be used to add that information. See
@@ -154,7 +203,7 @@ class XML(ModelMixin):
     wrapped = attr.ib(default=None, type=bool)
 
 
-@attr.s
+@attr.s(slots=True)
 class Discriminator(ModelMixin):
     """When request bodies or response payloads may be one of a number of different schemas, a discriminator object
     can be used to aid in serialization, deserialization, and validation. The discriminator is a specific object in a
@@ -165,17 +214,17 @@ class Discriminator(ModelMixin):
     mapping = attr.ib(default=dict)
 
 
-@attr.s
+@attr.s(slots=True)
 class Int64(Integer):
     format = attr.ib(default="int64", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class Image(BinaryString):
     pass
 
 
-@attr.s
+@attr.s(slots=True)
 class Array(Schema):
     items = attr.ib(default=None)
     type = attr.ib(default="array", init=False)
@@ -190,63 +239,69 @@ class Array(Schema):
 class SchemaFactory(object):
     """Converts an object into a json schema and returns a reference
 
+    Every factory is an independent schema registry, apps hosting several api specs can give each
+    spec its own factory through `register_openapi`. Registration is serialized by a lock while
+    reads are lock free, a frozen factory rejects new registrations.
+
     Properties:
         ref_base (str): json schema reference base, defaults to `#/components/schema`
-        components (dict[class, dict]): class and schema representation
+        schemas (dict[str, Schema]): registered schemas keyed by name
+        class_map (dict[type, dict]): resolved properties of plain classes keyed by class
+        frozen (bool): True once `freeze` was called
     """
 
     ref_base = attr.ib(default="#/components/schemas")
-    schemas = attr.ib(init=False, default={})
-    examples = attr.ib(init=False, default={})
+    schemas = attr.ib(init=False, factory=dict)
+    examples = attr.ib(init=False, factory=dict)
+    class_map = attr.ib(init=False, factory=dict, repr=False)
+    # schema names in order of registration, the log length is the current revision
+    history = attr.ib(init=False, factory=list, repr=False)
+    frozen = attr.ib(init=False, default=False)
+    _lock = attr.ib(init=False, factory=threading.RLock, repr=False, eq=False)
+    _pending = attr.ib(init=False, factory=dict, repr=False, eq=False)
 
-    def parse_data_fields(self, cls, fields):
-        """Parses classes implemented using either py37 dataclasses or attrs
+    def from_type(self, cls):
+        """Resolves the property schemas of a class, once per class
 
         Args:
-            cls (class):
-            fields (dict):
+            cls (type): plain, attrs or dataclass class
 
         Returns:
-
+            dict[str, Schema]: property schemas keyed by name
         """
-        if isinstance(fields, dict):
-            fields = fields.values()
-        for props in fields:
-            field_type = props.type or type(props.default) if props.default else str
-            CLASS_MAP[cls.__name__][props.name] = self.get_schema(field_type)
-
-    def from_type(self, cls):
-
-        if cls.__name__ in CLASS_MAP:
-            return CLASS_MAP[cls.__name__]
-
-        CLASS_MAP[cls.__name__] = {}
-        annotations = cls.__annotations__ if hasattr(cls, "__annotations__") else {}
-        members = inspect.getmembers(cls)
-        for field, member in members:
-
-            if field in ["__dataclass_fields__", "__attrs_attrs__"]:
-                self.parse_data_fields(cls, member)
-                continue
-
-            # skip private members and methods
-            if not (
-                field.startswith("_") or inspect.ismethod(member) or inspect.isfunction(member)
-            ):
-                field_type = type(member) if member else annotations.get(field)
-                field_type = field_type or str
-                CLASS_MAP[cls.__name__][field] = self.get_schema(field_type)
-
-        return CLASS_MAP[cls.__name__]
+        properties = self.class_map.get(cls)
+        if properties is not None:
+            return properties
+
+        with self._lock:
+            if cls in self.class_map:
+                return self.class_map[cls]
+            if cls in self._pending:
+                # self referencing class, still being resolved by this thread
+                return self._pending[cls]
+
+            properties = self._pending[cls] = {}
+            try:
+                for field, field_type in get_field_plan(cls):
+                    properties[field] = self.get_schema(field_type)
+            finally:
+                del self._pending[cls]
+            # publish only complete mappings to lock free readers
+            self.class_map[cls] = properties
+        return properties
 
     def get_schema(self, cls, description=None):
 
         # handle schema derivatives
         if isinstance(cls, Schema):
-            cls.description = description or cls.description
+            if not description or description == cls.description:
+                return cls
+            if is_interned(cls):
+                return attr.evolve(cls, description=description)
+            cls.description = description
             return cls
         # if raw dict instances
-        if isinstance(cls, collections.Mapping):
+        if isinstance(cls, collections.abc.Mapping):
             schema = Object(description=description)
             properties = {}
             for k, v in cls.items():
@@ -261,7 +316,7 @@ class SchemaFactory(object):
         # handle primitives
         if cls in SCHEMA_TYPES_MAP:
             schema_class = SCHEMA_TYPES_MAP[cls]
-            return schema_class()
+            return intern_schema(schema_class())
 
         # collection based typing
         if hasattr(cls, "__origin__"):
@@ -281,21 +336,87 @@ class SchemaFactory(object):
                 enums.append(v)
                 if v:
                     sch_type = SCHEMA_TYPES_MAP.get(type(v))
-            sch = sch_type(enum=enums, description=description)
+            sch = intern_schema(sch_type(enum=enums, description=description))
         # handle custom jo objects
         elif hasattr(cls, "jo_schema"):
             sch = cls.jo_schema()
         else:
             sch = Object()
             sch.properties = self.from_type(cls)
-        self.schemas[cls.__name__] = sch
-        return Schema(ref="{}/{}".format(self.ref_base, cls.__name__))
+        self.register(cls.__name__, sch)
+        return intern_schema(Schema(ref="{}/{}".format(self.ref_base, cls.__name__)))
+
+    def register(self, name, schema):
+        """Registers a named schema, to be emitted under `components.schemas`
+
+        Raises:
+            RuntimeError: if the factory is frozen
+        """
+
+        with self._lock:
+            if self.frozen:
+                msg = "Schema '{}' registered after freezing the factory".format(name)
+                raise RuntimeError(msg)
+            self.schemas[name] = schema
+            self.history.append(name)
+
+    def freeze(self, release=False):
+        """Stops accepting registrations, the factory is read only afterwards
+
+        Args:
+            release (bool): drops the registered schemas as well, for factories whose spec was
+                encoded for good, eg by `flaskdoc.freeze`
+        """
+
+        with self._lock:
+            self.frozen = True
+            if release:
+                self.schemas = {}
+                self.examples = {}
+                self.class_map = {}
+                self.history = []
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes this factory the target of schemas created in the current thread
+
+        Example:
+            .. code-block::
+
+                v2 = SchemaFactory()
+                with v2.activate():
+                    from myapi import v2_routes
+        """
+        stack = _active_factories.__dict__.setdefault("stack", [])
+        stack.append(self)
+        try:
+            yield self
+        finally:
+            stack.pop()
+
+    @property
+    def revision(self):
+        return len(self.history)
+
+    def changed_since(self, revision):
+        """Returns the schemas registered or replaced since a revision
+
+        Args:
+            revision (int): revision of the previous check, 0 for all schemas
+
+        Returns:
+            dict[str, Schema]: changed schemas keyed by name
+        """
+        return {name: self.schemas[name] for name in self.history[revision:]}
 
     def clear(self):
-        self.schemas = {}
+        with self._lock:
+            self.schemas = {}
+            self.class_map = {}
+            self.history = []
 
 
-@attr.s
+@attr.s(slots=True)
 class MediaType(ModelMixin):
     """Each Media Type Object provides schema and examples for the media type identified by its key."""
 
@@ -312,13 +433,12 @@ class MediaType(ModelMixin):
         # handle primitives
         if self.schema in [str, int, bool, dict]:
             schema_class = SCHEMA_TYPES_MAP[self.schema]
-            schema = schema_class()
-            return schema
+            return intern_schema(schema_class())
         # handle schema derivatives
         if isinstance(self.schema, Schema):
             return self.schema
         # handle custom class types
-        return schema_factory.get_schema(self.schema)
+        return get_schema_factory().get_schema(self.schema)
 
     def to_dict(self):
         return dict(
@@ -328,19 +448,19 @@ class MediaType(ModelMixin):
         )
 
 
-@attr.s
+@attr.s(slots=True)
 class JsonType(MediaType):
     """mime type application/json content type"""
 
     content_type = attr.ib(default="application/json", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class PlainText(MediaType):
     content_type = attr.ib(default="text/plain", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class UrlEncodedFormType(MediaType):
     content_type = attr.ib(default="application/x-www-form-urlencoded", init=False)
     encoding = attr.ib(default=None, type=Dict[str, "Encoding"])
@@ -351,7 +471,7 @@ class UrlEncodedFormType(MediaType):
         return d
 
 
-@attr.s
+@attr.s(slots=True)
 class MultipartType(UrlEncodedFormType):
 
     content_type = attr.ib(default="multipart/form-data")
@@ -366,12 +486,12 @@ class MultipartType(UrlEncodedFormType):
             )
 
 
-@attr.s
+@attr.s(slots=True)
 class XmlType(MediaType):
     content_type = attr.ib(default="application/xml", init=False)
 
 
-@attr.s
+@attr.s(slots=True)
 class MultipartFormData:
     file = BinaryString()
 
@@ -387,12 +507,110 @@ SCHEMA_TYPES_MAP = {
     AnyStr: String,
     ByteString: BinaryString,
 }
-CLASS_MAP = {}
 schema_factory = SchemaFactory()
+_active_factories = threading.local()
 
 
-@attr.s
-class ContentMixin(object):
+def get_schema_factory():
+    """Returns the factory activated in the current thread, the default `schema_factory` if none"""
+
+    stack = getattr(_active_factories, "stack", None)
+    return stack[-1] if stack else schema_factory
+
+
+def _structural_key(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_structural_key(v) for v in value)
+    # type is part of the key as 1 == True and 1 == 1.0
+    return type(value), value
+
+
+def intern_schema(schema):
+    """Returns the shared instance of a structurally identical schema
+
+    Only leaf schemas, ie primitives, references and enums whose fields are all hashable, are
+    interned. Interned schemas are shared and therefore immutable, assigning to them raises
+    `InternedSchemaError`, a `attr.exceptions.FrozenInstanceError`.
+
+    Args:
+        schema (Schema): freshly created schema
+
+    Returns:
+        Schema: shared schema, `schema` itself if it cannot be interned
+    """
+    try:
+        key = (type(schema), _structural_key(attr.astuple(schema, recurse=False)))
+        hash(key)
+    except TypeError:
+        # nested schemas, properties or other mutable fields
+        return schema
+    interned = INTERNED_SCHEMAS.setdefault(key, schema)
+    INTERNED_DICTS.setdefault(id(interned), None)
+    return interned
+
+
+def is_interned(schema):
+    return id(schema) in INTERNED_DICTS
+
+
+def get_field_plan(cls):
+    """Returns the fields of a class along with their types, introspecting the class on first use
+
+    Fields of attrs and dataclass classes are taken from `attr.fields` and `dataclasses.fields`
+    only. Fields of plain classes are their public class attributes, methods and properties
+    excepted, collected from the `vars` of their MRO in name order and typed by their value, or
+    their annotation if falsy. Annotations are resolved by `typing.get_type_hints`.
+
+    Args:
+        cls (type): plain, attrs or dataclass class
+
+    Returns:
+        tuple[tuple[str, type]]: `(name, type)` pairs in property order
+    """
+    plan = FIELD_PLANS.get(cls)
+    if plan is None:
+        plan = FIELD_PLANS[cls] = compile_field_plan(cls)
+    return plan
+
+
+def compile_field_plan(cls):
+    try:
+        hints = typing.get_type_hints(cls)
+    except Exception:
+        # unresolvable forward references, fall back to the raw annotations
+        hints = dict(getattr(cls, "__annotations__", None) or {})
+
+    if attr.has(cls):
+        return tuple(
+            (field.name, hints.get(field.name) or field.type or _default_type(field.default))
+            for field in attr.fields(cls)
+        )
+    if dataclasses is not None and dataclasses.is_dataclass(cls):
+        return tuple(
+            (field.name, hints.get(field.name, field.type)) for field in dataclasses.fields(cls)
+        )
+
+    # plain classes, public class attributes other than methods and properties, by name
+    members = {}
+    for klass in reversed(cls.__mro__[:-1]):
+        members.update(vars(klass))
+    plan = []
+    for name in sorted(members):
+        member = members[name]
+        if name.startswith("_") or isinstance(member, NON_FIELD_MEMBERS):
+            continue
+        plan.append((name, type(member) if member else hints.get(name) or str))
+    return tuple(plan)
+
+
+def _default_type(default):
+    if not default or isinstance(default, attr.Factory):
+        return str
+    return type(default)
+
+
+@attr.s(slots=True)
+class ContentMixin(ModelMixin):
 
     content = attr.ib()  # type: Union[MediaType, List[MediaType]]
 
@@ -409,7 +627,7 @@ class ContentMixin(object):
         self.content = cnt
 
 
-@attr.s
+@attr.s(slots=True)
 class Encoding(ExtensionMixin):
     """A single encoding definition applied to a single schema property."""
 
@@ -418,7 +636,7 @@ class Encoding(ExtensionMixin):
     style = attr.ib(default=None, type="Style")
     explode = attr.ib(default=True)
     allow_reserved = attr.ib(default=False)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
 
     def add_header(self, name, header):
         if not self.headers:
@@ -426,11 +644,11 @@ class Encoding(ExtensionMixin):
         self.headers[name] = header
 
 
-@attr.s
+@attr.s(slots=True)
 class Example(ExtensionMixin):
 
     summary = attr.ib(default=None, type=str)
     description = attr.ib(default=None, type=str)
     value = attr.ib(default=None)
     external_value = attr.ib(default=None, type=str)
-    extensions = attr.ib(default={})
+    extensions = attr.ib(default=None)
@@ -0,0 +1,39 @@
+from openapi_spec_validator import validate_spec
+
+from benchmarks import run, synthetic
+from flaskdoc.pallets import plugins
+
+
+def test_synthetic_app():
+    app = synthetic.make_app(6)
+    spec = app.test_client().get("/docs/openapi.json").json
+    validate_spec(spec)
+    assert len(app.config["SYNTHETIC_MODELS"]) == 2
+    assert sorted(spec["paths"]) == [
+        "/resource0",
+        "/resource0/{item_id}",
+        "/resource0/{item_id}/{version}",
+        "/resource1",
+        "/resource1/{item_id}",
+        "/resource1/{item_id}/{version}",
+    ]
+
+
+def test_run_benchmarks():
+    registered = len(plugins.SPEC_LOG), dict(plugins.API_SPECS)
+    report = run.run_benchmarks(routes=(4,), repeat=2)
+    assert (len(plugins.SPEC_LOG), dict(plugins.API_SPECS)) == registered
+    names = [result["name"] for result in report["results"]]
+    assert names == list(run.BENCHMARKS) + ["peak memory"]
+    assert all(result["routes"] == 4 for result in report["results"])
+    assert report["results"][-1]["value"] > 0
+
+    assert run.find_regressions(report, report, tolerance=0.2) == []
+    baseline = dict(results=[dict(result, median=1e-9, value=1) for result in report["results"]])
+    assert len(run.find_regressions(report, baseline, tolerance=0.2)) == len(names)
+
+
+def test_unsupported_benchmarks_are_skipped(monkeypatch):
+    monkeypatch.setitem(run.REQUIREMENTS, "jo.load", lambda: False)
+    report = run.run_benchmarks(routes=(4,), repeat=1, names=["jo.dumps", "jo.load"])
+    assert [result["name"] for result in report["results"]] == ["jo.dumps", "peak memory"]
@@ -1,3 +1,4 @@
+import gzip
 import json
 
 import flask
@@ -40,3 +41,585 @@ def test_mocks_spec_is_valid(client):
     r = client.get("/docs/openapi.json")
     print(json.dumps(r.json, indent=2))
     validate_spec(r.json)
+
+
+def test_openapi_json_etag(client):
+    """Tests the encoded spec is served with an ETag and revalidated with 304"""
+
+    response = client.get("/docs/openapi.json")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert "no-cache" in response.headers["Cache-Control"]
+
+    response = client.get("/docs/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    response = client.get("/docs/openapi.json", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json["openapi"] == "3.0.3"
+
+
+def test_openapi_yaml_matches_json(client):
+    """Tests the YAML document is emitted directly and matches the JSON document"""
+
+    json_docs = client.get("/docs/openapi.json").json
+    response = client.get("/docs/openapi.yaml")
+
+    assert response.mimetype == "application/yaml"
+    assert response.headers["ETag"]
+    assert yaml.safe_load(response.data) == json_docs
+
+
+@pytest.mark.parametrize("path", ["/docs/openapi.json", "/docs/openapi.yaml"])
+def test_openapi_precompressed(client, path):
+    """Tests spec documents are served precompressed when the client accepts gzip"""
+
+    plain = client.get(path)
+    assert plain.headers.get("Content-Encoding") is None
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] != plain.headers["ETag"]
+    assert gzip.decompress(response.data) == plain.data
+
+    response = client.get(
+        path,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_fingerprinted_assets(client):
+    """Tests ui assets are linked with content hashes and cached as immutable"""
+
+    page = client.get("/docs/").get_data(as_text=True)
+    url = next(u for u in page.split('"') if u.startswith("./swagger-ui-bundle.js?v="))
+
+    response = client.get("/docs/" + url[2:])
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+
+    response = client.get("/docs/swagger-ui-bundle.js?v=stale")
+    assert "immutable" not in response.headers.get("Cache-Control", "")
+
+
+@pytest.mark.parametrize("path", ["unknown.js?v=1", "..%2F__init__.py?v=1", "../__init__.py"])
+def test_unknown_assets(client, path):
+    """Tests only the bundled assets are served and fingerprinted"""
+
+    assert client.get("/docs/" + path).status_code == 404
+
+
+def test_precompressed_asset_sidecar(app, tmp_path):
+    """Tests gzip sidecars are served to clients accepting gzip"""
+    from flaskdoc.pallets import assets
+
+    (tmp_path / "ui.js").write_bytes(b"var ui = 1;")
+    (tmp_path / "ui.js.gz").write_bytes(gzip.compress(b"var ui = 1;"))
+
+    with app.test_request_context("/docs/ui.js", headers={"Accept-Encoding": "gzip"}):
+        response = assets.send_asset(str(tmp_path), "ui.js")
+        response.direct_passthrough = False
+        assert response.content_encoding == "gzip"
+        assert response.mimetype == "text/javascript"
+        assert gzip.decompress(response.get_data()) == b"var ui = 1;"
+
+    with app.test_request_context("/docs/ui.js"):
+        response = assets.send_asset(str(tmp_path), "ui.js")
+        response.direct_passthrough = False
+        assert response.content_encoding is None
+        assert response.get_data() == b"var ui = 1;"
+
+
+def test_api_rule_index(app):
+    """Tests view functions resolve to their first rule, including rules added later"""
+    from flaskdoc.examples import mocks
+    from flaskdoc.pallets.app import get_api_rule, get_rule_index
+
+    assert get_api_rule(mocks.echo, app).rule == "/mocks/echo/<string:sample>"
+    assert get_api_rule(test_api_rule_index, app) is None
+
+    # unchanged view functions are not indexed again
+    index = get_rule_index(app)
+    view_endpoints = index._view_endpoints
+    assert not index.is_stale(app)
+    assert get_api_rule(mocks.echo, app) is not None
+    assert index._view_endpoints is view_endpoints
+
+    def late():
+        return ""
+
+    app.add_url_rule("/late", view_func=late)
+    assert get_api_rule(late, app).rule == "/late"
+
+    def replacement():
+        return ""
+
+    app.view_functions["late"] = replacement
+    assert index.is_stale(app)
+    assert get_api_rule(late, app) is None
+    assert get_api_rule(replacement, app).rule == "/late"
+
+    app.view_functions = dict(app.view_functions, late=late)
+    assert index.is_stale(app)
+    assert get_api_rule(late, app).rule == "/late"
+
+
+def test_incremental_spec_build(app, client):
+    """Tests routes documented after the first build are patched into the served spec"""
+    from flaskdoc import swagger
+    from flaskdoc.pallets.app import get_api_docs
+
+    with app.app_context():
+        assert get_api_docs(app)
+        assert not get_api_docs(app)
+        paths = len(app.openapi.paths.items)
+
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="Late arrival")})
+    def late_arrival():
+        """Registered after the first build"""
+        return ""
+
+    app.add_url_rule("/late/<int:idx>", view_func=late_arrival)
+
+    response = client.get("/docs/openapi.json")
+    assert len(response.json["paths"]) == paths + 1
+    path_item = response.json["paths"]["/late/{idx}"]
+    assert path_item["description"] == "Registered after the first build"
+    assert path_item["get"]["responses"]["200"]["description"] == "Late arrival"
+
+
+def test_rebuilt_paths_keep_tags_once(app, client):
+    """Tests tags of a path parsed again by an incremental build are not added twice"""
+    from flaskdoc import swagger
+
+    @swagger.Tag(name="rebuilt")
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="Rebuilt")})
+    def rebuilt():
+        return ""
+
+    app.add_url_rule("/rebuilt", view_func=rebuilt)
+    spec = client.get("/docs/openapi.json").json
+    assert [tag["name"] for tag in spec["tags"]].count("rebuilt") == 1
+
+    swagger.POST(responses={"201": swagger.ResponseObject(description="Created")})(rebuilt)
+    spec = client.get("/docs/openapi.json").json
+    assert "post" in spec["paths"]["/rebuilt"]
+    assert [tag["name"] for tag in spec["tags"]].count("rebuilt") == 1
+
+    api = swagger.OpenApi(info=swagger.Info(title="Tags", version="1"), paths=swagger.Paths())
+    api.add_tag(swagger.Tag(name="twice"))
+    api.add_tag(swagger.Tag(name="twice"))
+    assert len(api.tags) == 2
+
+
+def test_replaced_view_function(app, client):
+    """Tests replacing the view function of an endpoint is picked up by the next build"""
+    from flaskdoc import swagger
+    from flaskdoc.pallets import documents
+    from flaskdoc.pallets.app import get_api_rule
+
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="First")})
+    def first():
+        return ""
+
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="Second")})
+    def second():
+        return ""
+
+    app.add_url_rule("/replaced", "replaced", view_func=first)
+    responses = client.get("/docs/openapi.json").json["paths"]["/replaced"]["get"]["responses"]
+    assert responses["200"]["description"] == "First"
+
+    builder = documents.get_state(app)["builder"]
+    assert not builder.is_stale(app)
+
+    app.view_functions["replaced"] = second
+    assert builder.is_stale(app)
+    # lookups refreshing the rule index first do not hide the replacement from the builder
+    assert get_api_rule(second, app).rule == "/replaced"
+    response = client.get("/docs/openapi.json")
+    responses = response.json["paths"]["/replaced"]["get"]["responses"]
+    assert responses["200"]["description"] == "Second"
+    assert not builder.is_stale(app)
+
+
+def test_documented_path_items_are_merged(app, client):
+    """Tests operations documented on app.openapi directly are kept along routed ones"""
+    from flaskdoc import swagger
+
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="Routed")})
+    def routed():
+        return ""
+
+    manual = swagger.POST(responses={"201": swagger.ResponseObject(description="Manual")})
+    app.openapi.paths.add("/documented", swagger.PathItem(summary="Hand written", post=manual))
+    app.add_url_rule("/documented", view_func=routed)
+
+    for deprecated in (None, True):
+        path_item = client.get("/docs/openapi.json").json["paths"]["/documented"]
+        assert path_item["summary"] == "Hand written"
+        assert path_item["get"]["responses"]["200"]["description"] == "Routed"
+        assert path_item["get"].get("deprecated") is deprecated
+        assert path_item["post"]["responses"]["201"]["description"] == "Manual"
+
+        # rebuilds the path
+        swagger.GET(deprecated=True, responses={"200": swagger.ResponseObject("Routed")})(routed)
+
+
+def test_streamed_openapi_json(app, client, monkeypatch):
+    """Tests the streamed JSON spec matches the buffered one"""
+    from flaskdoc import swagger
+    from flaskdoc.pallets import documents
+
+    # schemas are streamed item by item, not encoded whole
+    assert documents.streams_items(swagger.Schema)
+    buffered = client.get("/docs/openapi.json").json
+    monkeypatch.setitem(documents.get_state(app), "stream", True)
+
+    response = client.get("/docs/openapi.json")
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert json.loads(response.data) == buffered
+
+
+def test_per_app_settings():
+    """Tests apps registered in one process keep their own cache and stream settings"""
+    from flaskdoc import register_openapi
+    from flaskdoc.examples import petstore
+
+    cached, streamed = flask.Flask("cached"), flask.Flask("streamed")
+    register_openapi(cached, info=petstore.info, cache_max_age=60)
+    register_openapi(streamed, info=petstore.info, stream=True)
+
+    response = cached.test_client().get("/docs/openapi.json")
+    assert response.cache_control.max_age == 60
+    assert response.headers.get("ETag")
+
+    response = streamed.test_client().get("/docs/openapi.json")
+    assert response.cache_control.max_age is None
+    assert not response.headers.get("ETag")
+
+
+def test_streamed_openapi_json_with_transforms():
+    """Tests specs transformed on encoding are sent buffered, with the transforms applied"""
+    from flaskdoc import register_openapi
+    from flaskdoc.examples import petstore
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(petstore.pet)
+    register_openapi(app, info=petstore.info, stream=True, extract_components=64)
+
+    response = app.test_client().get("/docs/openapi.json")
+    assert response.headers.get("ETag")
+    assert response.json["components"]["responses"]
+
+
+def test_typed_path_parameters(app, client):
+    """Tests undocumented rule variables are documented from their converters"""
+    from flaskdoc import swagger
+    from flaskdoc.pallets import plugins
+
+    assert (
+        plugins.parse_flask_rule("/items/<int(min=1):item_id>/<name>")
+        == "/items/{item_id}/{name}"
+    )
+
+    @swagger.GET(
+        parameters=[swagger.PathParameter(name="rest", description="Hand written")],
+        responses={"200": swagger.ResponseObject(description="Item")},
+    )
+    def get_item(item_id, ref, rest):
+        return ""
+
+    app.add_url_rule("/items/<int(min=1):item_id>/<uuid:ref>/<path:rest>", view_func=get_item)
+
+    path_item = client.get("/docs/openapi.json").json["paths"]["/items/{item_id}/{ref}/{rest}"]
+    assert path_item["parameters"] == [
+        {
+            "name": "item_id",
+            "in": "path",
+            "required": True,
+            "schema": {"minimum": 1, "type": "integer", "format": "int32"},
+            "style": "simple",
+        },
+        {
+            "name": "ref",
+            "in": "path",
+            "required": True,
+            "schema": {"type": "string", "format": "uuid"},
+            "style": "simple",
+        },
+    ]
+    assert path_item["get"]["parameters"][0]["description"] == "Hand written"
+
+
+def test_spec_warm_up():
+    """Tests the spec is built in the background and readiness is reported"""
+    from flaskdoc import register_openapi, spec_ready
+    from flaskdoc.examples import inventory
+    from flaskdoc.pallets import documents
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(inventory.blp)
+    register_openapi(app, info=inventory.info, warm_up=True)
+    documents.get_state(app)["warm_up"].join(10)
+
+    assert spec_ready(app)
+    assert set(documents.get_state(app)["documents"]) == {"json", "yaml"}
+    response = app.test_client().get("/docs/_ready")
+    assert response.status_code == 200
+    assert response.json == {"ready": True}
+
+
+def test_spec_readiness_without_warm_up(client):
+    """Tests readiness is reported once the first request built the spec"""
+
+    assert client.get("/docs/_ready").status_code == 503
+    assert client.get("/docs/openapi.json").status_code == 200
+    assert client.get("/docs/_ready").status_code == 200
+
+
+def test_flask_subclass_with_register_openapi():
+    """Tests the subclass documents and the ui documents of one app are cached apart"""
+
+    import flaskdoc
+    from flaskdoc import swagger
+
+    app = flaskdoc.Flask(__name__, version="1.0.0", api_title="Subclass")
+
+    @app.route("/paints", methods=["GET"])
+    def list_paints():
+        return ""
+
+    flaskdoc.register_openapi(app, info=swagger.Info(title="Registered", version="2.0.0"))
+    client = app.test_client()
+
+    for _ in range(2):
+        assert client.get("/openapi.json").json["info"]["title"] == "Subclass"
+        assert client.get("/docs/openapi.json").json["info"]["title"] == "Registered"
+        assert yaml.safe_load(client.get("/openapi.yaml").data)["info"]["title"] == "Subclass"
+        response = client.get("/docs/openapi.yaml")
+        assert yaml.safe_load(response.data)["info"]["title"] == "Registered"
+
+
+def test_freeze(app, monkeypatch):
+    """Tests a frozen app serves its encoded spec without the spec tree"""
+    import collections
+    import gc
+
+    import flaskdoc
+    from flaskdoc.pallets import plugins
+
+    # the example views are shared with the apps of other tests
+    monkeypatch.setattr(plugins, "API_SPECS", collections.defaultdict(list, plugins.API_SPECS))
+    client = app.test_client()
+    expected = client.get("/docs/openapi.json").json
+    tag_slice = client.get("/docs/openapi.json?tag=pet").json
+    blueprint_slice = client.get("/docs/openapi/pet.json").json
+    try:
+        encoded = flaskdoc.freeze(app)
+        if hasattr(gc, "get_freeze_count"):
+            assert gc.get_freeze_count() > 0
+    finally:
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    assert {"json", "yaml", "machine.json", "machine.yaml"} < set(encoded)
+    assert {"json?tag=pet", "machine.yaml?tag=pet", "json?blueprint=pet"} < set(encoded)
+    assert app.openapi is None
+    assert not any(fn in plugins.API_SPECS for fn in app.view_functions.values())
+    assert flaskdoc.spec_ready(app)
+    assert client.get("/docs/openapi.json").json == expected
+    assert client.get("/docs/openapi.yaml").status_code == 200
+    assert client.get("/docs/openapi.json?tag=pet").json == tag_slice
+    assert client.get("/docs/openapi/pet.json").json == blueprint_slice
+    assert client.get("/docs/openapi.yaml?profile=machine&tag=pet").status_code == 200
+    assert client.get("/docs/openapi.json?tag=missing").status_code == 404
+
+
+def test_freeze_releases_spec_objects(monkeypatch):
+    """Tests freezing drops the specs, schemas and subclass spec still referenced by the app"""
+    import collections
+    import gc
+    import weakref
+
+    import flaskdoc
+    from flaskdoc import jo, swagger
+    from flaskdoc.pallets import plugins
+
+    monkeypatch.setattr(plugins, "API_SPECS", collections.defaultdict(list, plugins.API_SPECS))
+    factory = swagger.SchemaFactory()
+    with factory.activate():
+
+        @jo.schema()
+        class Frozen(object):
+            name = jo.string()
+
+        content = swagger.JsonType(schema=factory.get_schema(Frozen))
+    get = swagger.GET(
+        responses={"200": swagger.ResponseObject(description="Frozen", content=content)}
+    )
+
+    app = flaskdoc.Flask(__name__, version="1.0.0", api_title="Frozen")
+
+    @app.route("/frozen", methods=["GET"])
+    @get
+    def get_frozen():
+        return ""
+
+    flaskdoc.register_openapi(
+        app, info=swagger.Info(title="Frozen", version="1"), schema_factory=factory
+    )
+    subclass_doc = app.test_client().get("/openapi.json").data
+    assert app.test_client().get("/docs/openapi.json").status_code == 200
+    spec, schema = weakref.ref(get), weakref.ref(factory.schemas["Frozen"])
+    del get, content
+    try:
+        flaskdoc.freeze(app)
+    finally:
+        if hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    gc.collect()
+    assert spec() is None and schema() is None
+    assert factory.frozen and not factory.schemas and not factory.class_map
+    assert app._doc is None
+    client = app.test_client()
+    assert client.get("/openapi.json").data == subclass_doc
+    assert client.get("/docs/openapi.json").json["components"]["schemas"]["Frozen"]
+    assert client.get("/openapi.yaml").status_code == 200
+
+
+def test_build_stats():
+    """Tests spec builds and encodings are measured phase by phase"""
+
+    from flaskdoc import add_stats_listener, register_openapi
+    from flaskdoc.examples import inventory
+    from flaskdoc.pallets import stats
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(inventory.blp)
+    records = []
+    register_openapi(app, info=inventory.info, stats_listeners=[records.append])
+    client = app.test_client()
+    assert client.get("/docs/_stats").status_code == 404
+
+    add_stats_listener(app, stats.StatsCollector())
+    assert client.get("/docs/openapi.json").status_code == 200
+
+    build, encoding = records
+    assert build.name == "build"
+    assert list(build.phases) == [
+        stats.RULE_LOOKUP,
+        stats.PARSE_SPECS,
+        stats.SCHEMA_REGISTRATION,
+        stats.COMPONENT_ASSEMBLY,
+    ]
+    assert encoding.name == "json"
+    assert list(encoding.phases) == [stats.SERIALIZATION, stats.ENCODING]
+    assert encoding.wall_time >= encoding.phases[stats.ENCODING].wall_time > 0
+
+    # cached documents are neither built nor encoded again
+    for path in ("/docs/openapi.json", "/docs/openapi.json", "/docs/_ready"):
+        assert client.get(path).status_code == 200
+    assert [record.name for record in records] == ["build", "json"]
+
+    response = client.get("/docs/_stats")
+    assert [record["name"] for record in response.json["records"]] == ["build", "json"]
+    assert response.json["records"][1]["phases"]["encoding"]["calls"] == 1
+
+
+@pytest.mark.parametrize("url", ["/docs/openapi.json?tag=pet", "/docs/openapi/pet.json"])
+def test_spec_slices(client, url):
+    """Tests tag and blueprint slices only hold their paths and the schemas they reference"""
+
+    spec = client.get("/docs/openapi.json").json
+    response = client.get(url)
+    assert response.status_code == 200
+    validate_spec(response.json)
+
+    sliced = response.json
+    assert sorted(sliced["paths"]) == sorted(p for p in spec["paths"] if p.startswith("/pet"))
+    assert [tag["name"] for tag in sliced["tags"]] == ["pet"]
+    schemas = ["ApiResponse", "Category", "Pet", "Status", "Tag"]
+    assert sorted(sliced["components"]["schemas"]) == schemas
+    assert response.headers["ETag"] != client.get("/docs/openapi.json").headers["ETag"]
+
+    etag = response.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_spec_slice_not_found(client):
+    assert client.get("/docs/openapi.json?tag=missing").status_code == 404
+    assert client.get("/docs/openapi/missing.yaml").status_code == 404
+
+    response = client.get("/docs/openapi/inventory.yaml")
+    assert response.status_code == 200
+    assert sorted(yaml.safe_load(response.data)["paths"]) == ["/inventory"]
+
+
+def test_prune_components():
+    """Tests schemas no path references are left out, and come back once referenced"""
+
+    from flaskdoc import jo, register_openapi, swagger
+    from flaskdoc.examples import inventory
+    from flaskdoc.pallets.app import get_api_docs, get_pruned_schemas
+
+    @jo.schema()
+    class Orphan(object):
+        name = jo.string()
+
+    swagger.schema_factory.get_schema(Orphan)
+    app = flask.Flask(__name__)
+    app.register_blueprint(inventory.blp)
+    register_openapi(app, info=inventory.info, prune_components=True)
+
+    get_api_docs(app)
+    schemas = app.openapi.to_dict()["components"]["schemas"]
+    assert sorted(schemas) == ["InventoryItem", "Manufacturer"]
+    assert "Orphan" in get_pruned_schemas(app)
+    assert "InventoryItem" not in get_pruned_schemas(app)
+
+    blp = flask.Blueprint("orphans", __name__)
+
+    @swagger.GET(
+        responses={
+            "200": swagger.ResponseObject(
+                description="orphan", content=swagger.JsonType(schema=Orphan)
+            )
+        }
+    )
+    @blp.route("/orphans/<name>", methods=["GET"])
+    def get_orphan(name):
+        pass
+
+    app.register_blueprint(blp)
+    assert get_api_docs(app)
+    assert "Orphan" in app.openapi.to_dict()["components"]["schemas"]
+    assert "Orphan" not in get_pruned_schemas(app)
+
+    spec = app.test_client().get("/docs/openapi.json").json
+    validate_spec(spec)
+
+
+def test_machine_profile(client):
+    """Tests the machine profile is stripped of documentation and cached on its own"""
+
+    full = client.get("/docs/openapi.json")
+    response = client.get("/docs/openapi.json?profile=machine")
+    assert response.status_code == 200
+    validate_spec(response.json)
+    assert len(response.data) < len(full.data)
+    assert response.headers["ETag"] != full.headers["ETag"]
+    assert b'"summary"' not in response.data
+    assert b'"example"' not in response.data
+
+    etag = response.headers["ETag"]
+    response = client.get("/docs/openapi.json?profile=machine", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert client.get("/docs/openapi.yaml?profile=machine&tag=pet").status_code == 200
+    assert client.get("/docs/openapi.json?profile=unknown").status_code == 404
@@ -0,0 +1,51 @@
+import flask
+import yaml
+from click.testing import CliRunner
+
+import flaskdoc
+from flaskdoc import cli, swagger
+
+
+def test_export_and_serve_prebuilt(tmp_path):
+    """Tests exported spec documents are served as is by a prebuilt app"""
+
+    output = str(tmp_path / "spec")
+    result = CliRunner().invoke(
+        cli.flaskdoc, ["export", "flaskdoc.examples.app:make_app", "-o", output]
+    )
+    assert result.exit_code == 0, result.output
+    assert "openapi.json.gz" in result.output
+
+    app = flask.Flask("prebuilt")
+    flaskdoc.register_openapi(app, info=swagger.Info(title="Empty", version="0"), prebuilt=output)
+    client = app.test_client()
+
+    response = client.get("/docs/openapi.json")
+    assert response.status_code == 200
+    assert response.json["info"]["title"] == "Test"
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    with open(output + "/openapi.json", "rb") as f:
+        assert response.data == f.read()
+
+    response = client.get("/docs/openapi.yaml")
+    assert response.status_code == 200
+    assert yaml.safe_load(response.data)["info"]["title"] == "Test"
+
+    response = client.get("/docs/openapi.json?profile=machine")
+    assert response.status_code == 200
+    with open(output + "/openapi.machine.json", "rb") as f:
+        assert response.data == f.read()
+
+    response = client.get("/docs/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    response = client.get("/docs/openapi.json?tag=admin")
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json["tags"]] == ["admin"]
+    with open(output + "/openapi.json%3Ftag%3Dadmin", "rb") as f:
+        assert response.data == f.read()
+
+    response = client.get("/docs/openapi/inventory.yaml")
+    assert response.status_code == 200
+    assert sorted(yaml.safe_load(response.data)["paths"]) == ["/inventory"]
+    assert client.get("/docs/openapi.json?tag=missing").status_code == 404
@@ -0,0 +1,80 @@
+import copy
+
+import flask
+from openapi_spec_validator import validate_spec
+
+from flaskdoc import register_openapi
+from flaskdoc.examples import petstore
+from flaskdoc.pallets import extraction
+
+ADDRESS = {
+    "type": "object",
+    "properties": {"street": {"type": "string"}, "city": {"type": "string"}},
+}
+ERROR = {
+    "description": "not found",
+    "content": {"application/json": {"schema": {"type": "object", "properties": {"code": {}}}}},
+}
+PAGE = {"name": "page", "in": "query", "schema": {"type": "integer", "minimum": 1}}
+
+
+def make_spec():
+    def operation(schema):
+        return {
+            "parameters": [copy.deepcopy(PAGE)],
+            "responses": {"404": copy.deepcopy(ERROR), "default": {"description": "error"}},
+            "requestBody": {"content": {"application/json": {"schema": schema}}},
+        }
+
+    user = {
+        "type": "object",
+        "properties": {"home": copy.deepcopy(ADDRESS), "work": copy.deepcopy(ADDRESS)},
+    }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "sample", "version": "1"},
+        "paths": {
+            "/users": {"post": operation(copy.deepcopy(user))},
+            "/admins": {"post": operation(copy.deepcopy(user)), "put": operation(ADDRESS)},
+        },
+        "components": {"schemas": {"Address": copy.deepcopy(ADDRESS)}},
+    }
+
+
+def test_extract_components():
+    spec = extraction.extract_components(make_spec(), threshold=40)
+    validate_spec(spec)
+
+    components = spec["components"]
+    assert components["responses"] == {"Response404": ERROR}
+    assert components["parameters"] == {"page": PAGE}
+    # repeated user schemas are extracted whole, the addresses they hold reference the component
+    assert sorted(components["schemas"]) == ["Address", "InlineSchema"]
+    assert components["schemas"]["InlineSchema"]["properties"] == {
+        "home": {"$ref": "#/components/schemas/Address"},
+        "work": {"$ref": "#/components/schemas/Address"},
+    }
+
+    operation = spec["paths"]["/admins"]["post"]
+    assert operation["parameters"] == [{"$ref": "#/components/parameters/page"}]
+    assert operation["responses"]["404"] == {"$ref": "#/components/responses/Response404"}
+    assert operation["responses"]["default"] == {"description": "error"}
+    body = operation["requestBody"]["content"]["application/json"]
+    assert body["schema"] == {"$ref": "#/components/schemas/InlineSchema"}
+    put = spec["paths"]["/admins"]["put"]["requestBody"]["content"]["application/json"]
+    assert put["schema"] == {"$ref": "#/components/schemas/Address"}
+
+
+def test_extraction_threshold():
+    spec = make_spec()
+    assert extraction.extract_components(copy.deepcopy(spec), threshold=10000) == spec
+
+
+def test_extracted_documents():
+    app = flask.Flask(__name__)
+    app.register_blueprint(petstore.pet)
+    register_openapi(app, info=petstore.info, extract_components=64)
+
+    spec = app.test_client().get("/docs/openapi.json").json
+    validate_spec(spec)
+    assert spec["components"]["responses"]
@@ -68,3 +68,236 @@ def test_primitive_to_dict(schema_factory, cls, exp):
 def test_jo_models(schema_factory):
     schema = schema_factory.get_schema(models.Lemons)
     assert schema, "Not implemented"
+
+
+def test_interned_schemas(schema_factory):
+    """Tests identical leaf schemas are shared, immutable and described through copies"""
+    import attr
+
+    from flaskdoc import jo
+
+    assert schema_factory.get_schema(str) is schema_factory.get_schema(t.Text)
+    assert schema_factory.get_schema(models.OakTown) is schema_factory.get_schema(models.OakTown)
+    first, second = jo.string(max_length=5), jo.string(max_length=5)
+    assert first.metadata[jo.JO_SCHEMA] is second.metadata[jo.JO_SCHEMA]
+    assert jo.integer().metadata[jo.JO_SCHEMA] is not jo.number().metadata[jo.JO_SCHEMA]
+
+    integer = schema_factory.get_schema(int)
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        integer.description = "mutated"
+    assert integer.to_dict() is integer.to_dict()
+
+    described = schema_factory.get_schema(integer, description="age")
+    assert described is not integer
+    assert described.description == "age"
+    assert integer.description is None
+
+
+def test_interned_schema_copies(schema_factory):
+    """Tests interned schemas reject convert_props while their copies accept it"""
+    import attr
+
+    string = schema_factory.get_schema(str)
+    with pytest.raises(attr.exceptions.FrozenInstanceError, match="attr.evolve"):
+        string.convert_props(False)
+    assert string.to_dict() == {"type": "string"}
+
+    copy = attr.evolve(string, description="name", max_length=3)
+    copy.convert_props(False)
+    assert copy.to_dict() == {"type": "string", "description": "name", "max_length": 3}
+    assert schema_factory.get_schema(str) is string
+
+
+def test_schema_factories_are_isolated():
+    """Tests schemas created under an activated factory stay in that factory"""
+    from flaskdoc import swagger
+
+    v1, v2 = SchemaFactory(), SchemaFactory()
+    with v2.activate():
+        assert swagger.get_schema_factory() is v2
+        media = swagger.JsonType(schema=models.OakTown)
+        assert media.to_schema().ref == "#/components/schemas/OakTown"
+
+    assert swagger.get_schema_factory() is swagger.schema_factory
+    assert "OakTown" in v2.schemas
+    assert not v1.schemas and not v1.class_map
+
+    v2.freeze()
+    with pytest.raises(RuntimeError):
+        v2.get_schema(models.Squeezed)
+    # lookups keep working once frozen
+    assert v2.from_type(models.OakTown) is v2.class_map[models.OakTown]
+
+
+def test_schema_factory_concurrent_resolution():
+    """Tests concurrent first lookups of a class resolve it once and see complete properties"""
+    import threading
+
+    factory = SchemaFactory()
+    results = []
+
+    def resolve():
+        results.append(factory.from_type(models.OakTown))
+
+    threads = [threading.Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(r is results[0] for r in results)
+    assert set(results[0]) == {"oaks", "smugs", "snux"}
+
+
+def test_field_plans():
+    """Tests classes are introspected once, by class rather than by name"""
+    import dataclasses
+
+    from flaskdoc.swagger import schema
+
+    @dataclasses.dataclass
+    class Batch(object):
+        size: "int"
+        scale: t.ClassVar[int] = 3
+
+    factory = SchemaFactory()
+    props = factory.from_type(Batch)
+    assert props["size"].to_dict() == {"type": "integer", "format": "int32"}
+    # class variables are no dataclass fields
+    assert "scale" not in props
+    assert not factory.schemas
+    assert schema.get_field_plan(Batch) is schema.get_field_plan(Batch)
+
+    # attrs fields without defaults keep their declared type
+    assert factory.from_type(models.SoapStar)["meal"].to_dict() == {"type": "number"}
+
+    # same name, different classes
+    OakTown = type("OakTown", (object,), {"dry": True})
+    assert set(factory.from_type(OakTown)) == {"dry"}
+
+    # plain classes, inherited attributes included, methods and properties left out
+    Grove = type(
+        "Grove", (OakTown,), {"wet": 0.5, "age": property(lambda self: 1), "grow": lambda self: 1}
+    )
+    assert schema.get_field_plan(Grove) == (("dry", bool), ("wet", float))
+    assert set(factory.from_type(models.OakTown)) == {"oaks", "smugs", "snux"}
+
+
+def test_dumps():
+    """Tests compiled model encoders honor the advertised property names and types"""
+    import enum
+    import json
+
+    import flask
+
+    import flaskdoc
+    from flaskdoc import jo, swagger
+    from flaskdoc.pallets import plugins
+
+    class Shade(enum.Enum):
+        DARK = "dark"
+
+    @jo.schema(camel_case_props=True)
+    class Paint(object):
+        color_name = jo.string(required=True)
+        coats = jo.integer()
+        secret = jo.boolean(write_only=True)
+        shade = jo.object(item=Shade)
+        layers = jo.array(item=str)
+
+    paint = Paint(color_name="ñavy", coats=2.0, secret=True, shade=Shade.DARK, layers=["base"])
+    encoded = jo.dumps([paint, Paint(color_name="red")])
+    assert json.loads(encoded) == [
+        {"colorName": "ñavy", "coats": 2, "shade": "dark", "layers": ["base"]},
+        {"colorName": "red"},
+    ]
+    assert b'"coats":2,' in encoded
+
+    app = flaskdoc.Flask(__name__, version="1.0.0")
+
+    @app.route("/paints/<int:idx>", methods=["GET"])
+    def get_paint(idx):
+        return paint, 201
+
+    response = app.test_client().get("/paints/1")
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.json["colorName"] == "ñavy"
+
+    assert jo.is_model([paint, {"plain": True}])
+    assert not jo.is_model([])
+    assert not jo.is_model([{"plain": True}, paint])
+    assert not jo.is_model({"paints": [paint]})
+
+    plain = flask.Flask(__name__)
+
+    @plain.route("/paints", methods=["GET"])
+    @swagger.GET(responses={"200": swagger.ResponseObject(description="Paints")})
+    @flaskdoc.encode_models
+    def list_paints():
+        """Lists paints"""
+        return [paint, {"colorName": "white"}]
+
+    response = plain.test_client().get("/paints")
+    assert response.mimetype == "application/json"
+    assert response.json == [json.loads(jo.dumps(paint)), {"colorName": "white"}]
+    assert list_paints.__doc__ == "Lists paints"
+    assert plugins.API_SPECS[list_paints]
+
+
+def test_load():
+    """Tests compiled constructors map JSON keys, fill defaults and pick one_of types"""
+    from flaskdoc import jo, swagger
+
+    @jo.schema()
+    class Cat(object):
+        kind = jo.string(required=True)
+        lives = jo.integer(default=9)
+
+    @jo.schema()
+    class Dog(object):
+        kind = jo.string(required=True)
+        good_boy = jo.boolean(default=True)
+
+    @jo.schema(camel_case_props=True)
+    class Owner(object):
+        full_name = jo.string()
+        pets = jo.array(item=Cat)
+        favorite = jo.one_of([Cat, Dog], discriminator=swagger.Discriminator("kind"))
+        house_cat = jo.object(item=Cat)
+
+    data = {
+        "fullName": "Ann",
+        "pets": [{"kind": "Cat", "lives": 3}],
+        "favorite": {"kind": "Dog"},
+        "house_cat": {"kind": "Cat"},
+        "unknown": 1,
+    }
+    owner = Owner.from_dict(data)
+    assert owner.full_name == "Ann"
+    assert owner.pets == [Cat(kind="Cat", lives=3)]
+    assert owner.favorite == Dog(kind="Dog", good_boy=True)
+    assert owner.house_cat == Cat(kind="Cat", lives=9)
+    assert jo.load(Owner, [data, {}])[1] == Owner()
+
+    with pytest.raises(TypeError):
+        jo.load(Owner, "Ann")
+
+    @jo.schema()
+    class Vault(object):
+        _secret_code = jo.string()
+
+    for key in ("secret_code", "secretCode", "_secret_code"):
+        assert Vault.from_dict({key: "1234"}) == Vault(secret_code="1234")
+
+    # union members are resolved on load, unions may refer to their own class
+    branches = [Cat]
+
+    @jo.schema()
+    class Branch(object):
+        name = jo.string()
+        child = jo.one_of(branches)
+
+    branches.append(Branch)
+    tree = Branch.from_dict({"name": "root", "child": {"name": "leaf", "child": {"kind": "Cat"}}})
+    assert tree.child == Branch(name="leaf", child=Cat(kind="Cat"))
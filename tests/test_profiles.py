@@ -0,0 +1,75 @@
+from flaskdoc.pallets import profiles
+
+
+def test_strip_documentation():
+    spec = {
+        "info": {"title": "sample", "version": "1", "description": "long", "x-logo": "logo.png"},
+        "externalDocs": {"url": "https://example.com"},
+        "paths": {
+            "/items": {
+                "get": {
+                    "summary": "lists items",
+                    "parameters": [{"name": "q", "in": "query", "description": "query"}],
+                    "responses": {
+                        "200": {
+                            "description": "items",
+                            "headers": {"x-rate-limit": {"schema": {"type": "integer"}}},
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Item"},
+                                    "example": {"description": "kept out"},
+                                }
+                            },
+                        }
+                    },
+                    "x-internal": True,
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Item": {
+                    "type": "object",
+                    "description": "an item",
+                    "properties": {
+                        "description": {"type": "string", "example": "a", "default": "none"},
+                        "summary": {"type": "string", "enum": ["a", "b"]},
+                    },
+                }
+            },
+            "examples": {"item": {"value": {}}},
+        },
+    }
+    assert profiles.strip_documentation(spec) == {
+        "info": {"title": "sample", "version": "1"},
+        "paths": {
+            "/items": {
+                "get": {
+                    "parameters": [{"name": "q", "in": "query"}],
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            "headers": {"x-rate-limit": {"schema": {"type": "integer"}}},
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Item"}
+                                }
+                            },
+                        }
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Item": {
+                    "type": "object",
+                    "properties": {
+                        "description": {"type": "string", "default": "none"},
+                        "summary": {"type": "string", "enum": ["a", "b"]},
+                    },
+                }
+            }
+        },
+    }
+    assert spec["info"]["description"] == "long"
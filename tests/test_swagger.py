@@ -1,6 +1,7 @@
 """ Tests swagger related models and decorators """
 import pytest
 
+from flaskdoc import core
 from flaskdoc.swagger import models
 
 
@@ -57,3 +58,20 @@ def test_nested_models():
     variables = swagger["variables"]
     assert variables["tick"]["default"] == "sample"
     assert variables["tick"]["description"] == "dirty dozen"
+
+
+def test_compiled_serializer_matches_parse():
+    """Tests the per class compiled serializer emits the same dict as the generic parse"""
+
+    param = models.QueryParameter(name="page", description="page number", allow_empty_value=True)
+    param.add_extension("x-internal", True)
+    server = models.Server(url="http://flaskdoc.com")
+    server.convert_props(False)
+
+    for model in [param, server, models.Info(title="T", version="1", terms_of_service="tos")]:
+        assert model.to_dict() == model.parse(core.instance_values(model))
+
+    d = param.to_dict()
+    assert d["in"] == "query"
+    assert d["allowEmptyValue"] is True
+    assert d["x-internal"] is True
@@ -1,3 +1,5 @@
+import pytest
+
 from flaskdoc import swagger
 
 info_block = swagger.Info(
@@ -29,3 +31,25 @@ def test_sample_swagger():
 
     swagger_json = api.to_dict()
     assert swagger_json
+
+
+def test_models_are_slotted():
+    param = swagger.QueryParameter(name="search", schema=swagger.String())
+    assert not hasattr(param, "__dict__")
+    assert not hasattr(swagger.Paths(), "__dict__")
+    with pytest.raises(AttributeError):
+        param.unknown = True
+
+
+def test_extensions_are_not_shared():
+    tag = swagger.Tag(name="sample").add_extension("x-internal", True)
+    other = swagger.Tag(name="other")
+    assert other.extensions is None
+    assert tag.to_dict() == {"name": "sample", "x-internal": True}
+    assert other.to_dict() == {"name": "other"}
+
+
+def test_containers_do_not_share_items():
+    paths = swagger.Paths()
+    paths.add("/sample", swagger.PathItem(summary="sample"))
+    assert swagger.Paths().get("/sample") is None
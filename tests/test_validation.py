@@ -0,0 +1,90 @@
+import flask
+import pytest
+
+from flaskdoc import jo, swagger
+from flaskdoc.pallets import validation
+
+
+@jo.schema(additional_properties=False)
+class Gadget(object):
+    name = jo.string(required=True, min_length=3, max_length=8)
+    code = jo.string(pattern=r"^[A-Z]{2}-\d+$")
+    color = jo.string(enum=["red", "blue"])
+    weight = jo.number(minimum=0, maximum=10, exclusive_max=True)
+    serial = jo.integer(required=True, read_only=True)
+    parts = jo.array(item=str, min_items=1, unique_items=True)
+
+
+@pytest.fixture
+def gadget_app():
+    app = flask.Flask(__name__)
+    blp = flask.Blueprint("gadgets", __name__)
+
+    @swagger.POST(
+        request_body=swagger.RequestBody(content=swagger.JsonType(schema=Gadget), required=True),
+        responses={"201": swagger.ResponseObject(description="created")},
+    )
+    @blp.route("/gadgets", methods=["POST"])
+    def add_gadget():
+        return flask.jsonify(flask.request.get_json()), 201
+
+    @blp.route("/gadgets", methods=["GET"])
+    def list_gadgets():
+        return flask.jsonify([])
+
+    validation.validate_requests(blp)
+    app.register_blueprint(blp)
+    return app
+
+
+def test_valid_request_body(gadget_app):
+    body = dict(name="spring", code="AB-12", color="red", weight=9.5, parts=["coil"])
+    response = gadget_app.test_client().post("/gadgets", json=body)
+    assert response.status_code == 201
+    assert response.json == body
+
+
+@pytest.mark.parametrize(
+    "body, path, message",
+    [
+        (dict(code="AB-1"), "/", "'name' is a required property"),
+        (dict(name="no"), "/name", "is shorter than 3"),
+        (dict(name=3), "/name", "is not of type 'string'"),
+        (dict(name="spring", code="ab-1"), "/code", "does not match '^[A-Z]{2}-\\d+$'"),
+        (dict(name="spring", color="green"), "/color", "is not one of ['red', 'blue']"),
+        (dict(name="spring", weight=10), "/weight", "is greater than or equal to 10"),
+        (dict(name="spring", parts=[]), "/parts", "has fewer than 1 items"),
+        (dict(name="spring", parts=["a", "a"]), "/parts", "has non-unique items"),
+        (dict(name="spring", parts=[1]), "/parts/0", "is not of type 'string'"),
+        (dict(name="spring", size=2), "/", "'size' is not an allowed property"),
+    ],
+)
+def test_invalid_request_body(gadget_app, body, path, message):
+    response = gadget_app.test_client().post("/gadgets", json=body)
+    assert response.status_code == 400
+    assert response.json["errors"] == [dict(path=path, message=message)]
+
+
+def test_unvalidated_requests(gadget_app):
+    client = gadget_app.test_client()
+    assert client.get("/gadgets").status_code == 200
+
+    response = client.post("/gadgets")
+    assert response.status_code == 400
+    assert response.json["errors"] == [dict(path="/", message="request body is required")]
+
+
+def test_recursive_schema_references():
+    @jo.schema()
+    class Node(object):
+        value = jo.integer(required=True)
+
+    factory = swagger.SchemaFactory()
+    ref = factory.get_schema(Node)
+    node = factory.schemas["Node"]
+    node.properties["children"] = swagger.Array(items=ref)
+
+    validate = validation.SchemaCompiler(factory).compile(ref)
+    errors = []
+    validate(dict(value=1, children=[dict(value=2, children=[dict(value="3")])]), "", errors)
+    assert errors == [("/children/0/children/0/value", "is not of type 'integer'")]